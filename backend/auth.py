@@ -1,7 +1,5 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
@@ -15,13 +13,16 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 480
 
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 def verify_password(plain_password: str) -> bool:
     return plain_password == ADMIN_PASSWORD
 
+# python-jose (and the cryptography backend behind it) is imported on first
+# use, so server processes start without it.
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -32,6 +33,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    from jose import JWTError, jwt
     try:
         token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -49,3 +51,10 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+def is_admin_token(token: str) -> bool:
+    try:
+        verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    except HTTPException:
+        return False
+    return True
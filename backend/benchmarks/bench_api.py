@@ -0,0 +1,186 @@
+"""Load-test the read and admin write endpoints against synthetic databases.
+
+Usage (from backend/):
+    python benchmarks/bench_api.py --profiles 1000 10000 100000 --concurrency 16 --requests 2000 [--output results.json]
+    python benchmarks/bench_api.py --base-url http://127.0.0.1:8000 --profiles 1000
+
+For each size the database is generated once (benchmarks/data/, see
+make_db.py), copied, and served by a fresh uvicorn process with the refresh
+workers off. With --base-url an already running server is used instead and
+--profiles only sets the range of ids requested.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.make_db import ensure_db
+from benchmarks.stats import environment, summarize
+from benchmarks.synthetic import DEPARTMENTS, TOPICS, make_faculty
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each scenario returns (method, path, json body) for the n-th request.
+Request = Tuple[str, str, Any]
+
+def scenarios(profiles: int, rng: random.Random) -> Dict[str, Callable[[int], Request]]:
+    def payload(index: int) -> Dict[str, Any]:
+        data = make_faculty(index, rng)
+        data.pop("last_updated")
+        return data
+
+    return {
+        "list_faculty": lambda n: ("GET", "/api/faculty?limit=50", None),
+        "list_faculty_summary": lambda n: ("GET", "/api/faculty?limit=500&view=summary", None),
+        "get_faculty_by_id": lambda n: ("GET", f"/api/faculty/{rng.randint(1, profiles)}", None),
+        "search_faculty": lambda n: ("GET", f"/api/search?q={rng.choice(TOPICS).split()[0]}", None),
+        "filter_faculty_facets": lambda n: (
+            "GET", f"/api/faculty?limit=50&view=summary&facets=true&department={rng.choice(DEPARTMENTS)}", None
+        ),
+        "suggest": lambda n: ("GET", f"/api/suggest?q={rng.choice(TOPICS)[:rng.randint(1, 6)]}", None),
+        # Fresh indexes keep the generated emails unique.
+        "admin_create": lambda n: ("POST", "/api/admin/faculty", payload(profiles * 2 + n)),
+        "admin_update": lambda n: (
+            "PUT", f"/api/admin/faculty/{rng.randint(1, profiles)}", payload(profiles * 4 + n)
+        ),
+    }
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Request],
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    latencies = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            method, path, body = make_request(n)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return dict(summarize(latencies, time.perf_counter() - start, errors), statuses=statuses)
+
+async def run_benchmarks(base_url: str, profiles: int, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        response = await client.post("/api/admin/login", json={"password": args.admin_password})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        results = {}
+        for name, make_request in scenarios(profiles, rng).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            if args.warmup:
+                await run_scenario(client, make_request, args.warmup, args.concurrency)
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+    return results
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(database_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_PATH=database_path, REFRESH_WORKERS="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 300):
+    # Startup includes loading the read model, which takes a while at 100k.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/faculty?limit=1", timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+def bench_size(profiles: int, args) -> Dict[str, Any]:
+    if args.base_url:
+        return {"profiles": profiles, "scenarios": asyncio.run(run_benchmarks(args.base_url, profiles, args))}
+
+    source = ensure_db(profiles)
+    workdir = tempfile.mkdtemp(prefix="bench-api-")
+    # The write scenarios change the database, so every run starts from a copy.
+    database_path = os.path.join(workdir, "faculty_hub.db")
+    for suffix in ("", "-wal"):
+        if os.path.exists(source + suffix):
+            shutil.copyfile(source + suffix, database_path + suffix)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(database_path, port)
+    try:
+        started = time.perf_counter()
+        wait_until_ready(base_url, server)
+        startup = time.perf_counter() - started
+        results = asyncio.run(run_benchmarks(base_url, profiles, args))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"profiles": profiles, "startup_s": round(startup, 3), "scenarios": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, nargs="+", default=[1000])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", help="only run these scenarios")
+    parser.add_argument("--base-url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD", "admin123"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = {
+        "benchmark": "api",
+        "environment": environment(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "sizes": [bench_size(profiles, args) for profiles in args.profiles],
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
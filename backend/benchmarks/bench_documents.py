@@ -0,0 +1,69 @@
+"""Compare the per-request formatting path with pre-rendered documents.
+
+Usage (from backend/):
+    python benchmarks/bench_documents.py --records 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.synthetic import make_faculty
+from documents import format_faculty_response, json_array, render_document
+from models import FacultyResponse
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    faculty = [dict(make_faculty(i, rng), id=i + 1) for i in range(args.records)]
+    adapter = TypeAdapter(List[FacultyResponse])
+    documents = [render_document(f) for f in faculty]
+
+    def formatted_path():
+        # What FastAPI did per request: format, validate through the
+        # response model, make it JSON-safe, then encode.
+        content = adapter.validate_python([format_faculty_response(f) for f in faculty])
+        body = json.dumps(
+            jsonable_encoder(adapter.dump_python(content, mode="json")),
+            ensure_ascii=False, separators=(",", ":")
+        ).encode()
+        return body
+
+    def document_path():
+        return json_array(documents)
+
+    # Both paths must produce the same JSON.
+    assert json.loads(formatted_path()) == json.loads(document_path())
+
+    old = best_of(formatted_path, args.repeat)
+    new = best_of(document_path, args.repeat)
+    print(json.dumps({
+        "records": args.records,
+        "bytes": len(document_path()),
+        "formatted_ms": round(old * 1000, 3),
+        "documents_ms": round(new * 1000, 3),
+        "speedup": round(old / new, 1),
+    }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare the legacy BeautifulSoup parsers with the lxml/XPath parsers.
+
+Usage (from backend/):
+    python benchmarks/bench_parse.py --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import (
+    parse_google_scholar_legacy, parse_google_scholar_lxml,
+    parse_linkedin_legacy, parse_linkedin_lxml
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CASES = (
+    ("linkedin_profile.html", parse_linkedin_legacy, parse_linkedin_lxml),
+    ("scholar_profile.html", parse_google_scholar_legacy, parse_google_scholar_lxml),
+)
+
+def best_of(fn, content: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for fixture, legacy, fast in CASES:
+        with open(os.path.join(FIXTURES, fixture), "rb") as f:
+            content = f.read()
+
+        # Both parsers must extract the same data.
+        assert legacy(content) == fast(content), fixture
+
+        old = best_of(legacy, content, args.repeat)
+        new = best_of(fast, content, args.repeat)
+        print(json.dumps({
+            "fixture": fixture,
+            "bytes": len(content),
+            "legacy_ms": round(old * 1000, 3),
+            "lxml_ms": round(new * 1000, 3),
+            "speedup": round(old / new, 1),
+        }))
+
+if __name__ == "__main__":
+    main()
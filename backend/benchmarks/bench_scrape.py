@@ -0,0 +1,99 @@
+"""Benchmark scrape_faculty_data offline against the local fixture server.
+
+Usage (from backend/):
+    python benchmarks/bench_scrape.py --profiles 200 --concurrency 16 [--latency-ms 50] [--parse-workers 2]
+
+Runs a cold pass (empty page cache, every page downloaded and parsed) and a
+revalidation pass (conditional requests answered with 304, parsing skipped).
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixture_server import start_server
+from benchmarks.stats import environment, summarize
+
+async def run_pass(scrape_faculty_data, profiles, concurrency: int, known_hashes=None):
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    hashes = {}
+
+    async def one(linkedin_url: str, scholar_url: str):
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                data = await scrape_faculty_data(linkedin_url, scholar_url, known_hashes)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            if data["failed_sources"]:
+                errors += 1
+            hashes.update(data["page_hashes"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*urls) for urls in profiles))
+    return summarize(latencies, time.perf_counter() - start, errors), hashes
+
+async def run(args) -> dict:
+    # The scraper reads its settings on import.
+    cache_dir = tempfile.mkdtemp(prefix="bench-page-cache-")
+    os.environ["SCRAPER_CACHE_DIR"] = cache_dir
+    os.environ["SCRAPER_PARSE_WORKERS"] = str(args.parse_workers)
+    os.environ.setdefault("SCHOLAR_PAGE_INTERVAL", "0")
+    from scraper import close_client, scrape_faculty_data
+
+    server, port = start_server(latency=args.latency_ms / 1000, scholar_pages=args.scholar_pages)
+    # Different host names, so each source gets its own per-host slots as
+    # linkedin.com and scholar.google.com would.
+    profiles = [
+        (f"http://localhost:{port}/in/profile-{i}", f"http://127.0.0.1:{port}/citations?user=U{i:07d}")
+        for i in range(args.profiles)
+    ]
+    try:
+        cold, hashes = await run_pass(scrape_faculty_data, profiles, args.concurrency)
+        revalidate, _ = await run_pass(scrape_faculty_data, profiles, args.concurrency, hashes)
+    finally:
+        await close_client()
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        "benchmark": "scrape",
+        "environment": environment(),
+        "profiles": args.profiles,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "parse_workers": args.parse_workers,
+        "scholar_pages": args.scholar_pages,
+        "scenarios": {"cold": cold, "revalidate": revalidate},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated network delay per response")
+    parser.add_argument("--parse-workers", type=int, default=int(os.getenv("SCRAPER_PARSE_WORKERS", "2")))
+    parser.add_argument("--scholar-pages", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
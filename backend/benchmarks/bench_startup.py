@@ -0,0 +1,89 @@
+"""Measure the cold-start import time of the API module.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py [--repeat 5] [--module main] [--top 10] [--output startup.json]
+
+Each run imports the module in a fresh interpreter with -X importtime, so
+nothing is shared between runs. Reports the module's cumulative import time,
+the whole process's wall time, and the slowest of its direct imports.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stats import environment
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(module: str) -> Tuple[float, Dict[str, int]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+
+    times = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # -X importtime lists a module after its own imports, which are
+        # indented one level deeper.
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == module:
+                times = dict(children, **{module: int(cumulative)})
+            children = {}
+    return wall, times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="direct imports to report")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    walls = []
+    runs = []
+    for _ in range(args.repeat):
+        wall, times = run_once(args.module)
+        walls.append(wall)
+        runs.append(times)
+
+    totals = [times[args.module] / 1000 for times in runs]
+    imports = {
+        name: round(statistics.median(times.get(name, 0) for times in runs) / 1000, 1)
+        for name in runs[0] if name != args.module
+    }
+    slowest = dict(sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top])
+    result = {
+        "benchmark": "startup",
+        "environment": environment(),
+        "module": args.module,
+        "repeat": args.repeat,
+        "import_ms": {"median": round(statistics.median(totals), 1), "min": round(min(totals), 1)},
+        "process_ms": {"median": round(statistics.median(walls) * 1000, 1), "min": round(min(walls) * 1000, 1)},
+        "imports_ms": slowest,
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Serve the LinkedIn and Scholar fixtures locally so scraping can be benchmarked offline.
+
+Usage (from backend/):
+    python benchmarks/fixture_server.py [--port 8900] [--latency-ms 50] [--scholar-pages 1]
+
+    LinkedIn profiles:  http://localhost:8900/in/<slug>
+    Scholar profiles:   http://127.0.0.1:8900/citations?user=<id>
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Rows per Scholar page, matching scraper.SCHOLAR_PAGE_SIZE.
+SCHOLAR_PAGE_SIZE = 100
+EMPTY_SCHOLAR_PAGE = b'<html><body><table id="gsc_a_t"><tbody id="gsc_a_b"></tbody></table></body></html>'
+
+def _load(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    linkedin = _load("linkedin_profile.html")
+    scholar = _load("scholar_profile.html")
+    latency = 0.0
+    scholar_pages = 1
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/in/"):
+            body = self.linkedin
+        elif parsed.path == "/citations":
+            cstart = int(parse_qs(parsed.query).get("cstart", ["0"])[0])
+            # The same page of rows stands in for each older page.
+            body = self.scholar if cstart < self.scholar_pages * SCHOLAR_PAGE_SIZE else EMPTY_SCHOLAR_PAGE
+        else:
+            self.send_error(404)
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port: int = 0, latency: float = 0.0, scholar_pages: int = 1) -> Tuple[ThreadingHTTPServer, int]:
+    # Runs in a daemon thread; call shutdown() on the server to stop it.
+    handler = type("Handler", (FixtureHandler,), {"latency": latency, "scholar_pages": scholar_pages})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--scholar-pages", type=int, default=1)
+    args = parser.parse_args()
+
+    server, port = start_server(args.port, args.latency_ms / 1000, args.scholar_pages)
+    print(f"Serving fixtures on http://127.0.0.1:{port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Generate a synthetic faculty_hub.db for the benchmarks.
+
+Usage (from backend/):
+    python benchmarks/make_db.py --profiles 10000 [--output benchmarks/data/faculty_hub_10000.db] [--force]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_faculty
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CHUNK_SIZE = 1000
+
+def default_path(profiles: int) -> str:
+    return os.path.join(DATA_DIR, f"faculty_hub_{profiles}.db")
+
+async def generate(path: str, profiles: int, stale: bool = False, seed: int = 42):
+    # database reads DATABASE_PATH on import.
+    os.environ["DATABASE_PATH"] = path
+    from database import close_db, init_db, upsert_faculty_many
+
+    rng = random.Random(seed)
+    now = datetime.now().isoformat()
+    await init_db()
+    try:
+        for start in range(0, profiles, CHUNK_SIZE):
+            records = [make_faculty(i, rng) for i in range(start, min(start + CHUNK_SIZE, profiles))]
+            if not stale:
+                # Fresh profiles, so reads don't queue refreshes mid-benchmark.
+                for record in records:
+                    record["last_updated"] = now
+            await upsert_faculty_many(records)
+    finally:
+        await close_db()
+
+def ensure_db(profiles: int, path: str = None, force: bool = False, stale: bool = False) -> str:
+    path = path or default_path(profiles)
+    if force or not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        asyncio.run(generate(path, profiles, stale))
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--output")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the file exists")
+    parser.add_argument("--stale", action="store_true", help="keep the synthetic 2025 last_updated dates")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = ensure_db(args.profiles, args.output, args.force, args.stale)
+    print(json.dumps({
+        "profiles": args.profiles,
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }))
+
+if __name__ == "__main__":
+    main()
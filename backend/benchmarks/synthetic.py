@@ -0,0 +1,67 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+DEPARTMENTS = [
+    "Computer Science", "Mechanical Engineering", "Civil Engineering",
+    "Electrical Engineering", "Electronics and Communication",
+    "Information Technology", "Chemical Engineering", "Biotechnology",
+    "Mathematics", "Physics", "Chemistry", "Management Studies", "Humanities",
+]
+DESIGNATIONS = [
+    "Assistant Professor", "Associate Professor", "Professor",
+    "Head of Department", "Research Scholar", "Visiting Professor", "Lecturer",
+]
+FIRST_NAMES = ["Asha", "Rahul", "Priya", "Vikram", "Meera", "Arjun", "Nisha", "Karan", "Sneha", "Rohan"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Kulkarni", "Deshpande", "Nair", "Rao", "Joshi", "Mehta", "Kapoor"]
+VENUES = ["IEEE Transactions", "ACM Computing Surveys", "Nature Communications", "Physical Review B", "NeurIPS"]
+COMPANIES = ["MIT", "IIT Bombay", "Stanford University", "Infosys", "TCS", "Google", "ISRO", "IISc"]
+TOPICS = [
+    "deep learning", "graph neural networks", "power systems", "structural health monitoring",
+    "computational fluid dynamics", "wireless sensor networks", "protein folding",
+    "renewable energy", "compiler optimization", "quantum chemistry", "supply chain analytics",
+]
+
+def make_faculty(index: int, rng: random.Random) -> Dict[str, Any]:
+    # Sizes follow what real profiles look like after a few Scholar refreshes:
+    # a handful of jobs and projects, and tens of publications.
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    topic = rng.choice(TOPICS)
+    return {
+        "name": f"Dr. {first} {last} {index}",
+        "designation": rng.choice(DESIGNATIONS),
+        "department": rng.choice(DEPARTMENTS),
+        "office_location": f"Building {rng.choice('ABCDE')}, Room {rng.randint(100, 599)}",
+        "email": f"{first.lower()}.{last.lower()}.{index}@university.edu",
+        "google_scholar_url": f"https://scholar.google.com/citations?user=U{index:07d}",
+        "linkedin_url": f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{index}",
+        "profile_picture_url": f"https://media.licdn.com/dms/image/{index:08d}/profile.jpg",
+        "headline": f"Researcher in {topic} and {rng.choice(TOPICS)}",
+        "experience": [
+            {
+                "position": rng.choice(DESIGNATIONS),
+                "company": rng.choice(COMPANIES),
+                "duration": f"{2000 + i * 4}-{2004 + i * 4}",
+            }
+            for i in range(rng.randint(2, 6))
+        ],
+        "certifications": [
+            {"name": f"Certificate in {rng.choice(TOPICS)}", "issuer": rng.choice(COMPANIES)}
+            for _ in range(rng.randint(0, 3))
+        ],
+        "projects": [
+            {"title": f"{rng.choice(TOPICS).title()} Lab", "description": f"Applied research on {rng.choice(TOPICS)}"}
+            for _ in range(rng.randint(1, 4))
+        ],
+        "publications": [
+            {
+                "title": f"On {rng.choice(TOPICS)} for {rng.choice(TOPICS)}: part {i}",
+                "authors": f"{first[0]}. {last}, {rng.choice(FIRST_NAMES)[0]}. {rng.choice(LAST_NAMES)}",
+                "year": str(rng.randint(2005, 2025)),
+                "citation": f"{rng.choice(VENUES)} {rng.randint(1, 60)} ({rng.randint(1, 12)})",
+                "cited_by": rng.choice([None, rng.randint(1, 2000)]),
+            }
+            for i in range(rng.randint(5, 40))
+        ],
+        "last_updated": (datetime(2025, 1, 1) + timedelta(minutes=index)).isoformat(),
+    }
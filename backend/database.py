@@ -1,54 +1,640 @@
-import sqlite3
+import aiosqlite
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
+from itertools import groupby
 import json
-from typing import Optional, List, Dict, Any
+import os
+import re
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Iterable, NamedTuple, Tuple
 
-DATABASE_PATH = "faculty_hub.db"
+from documents import render_document, render_summary
+from metrics import db_call_duration, timed
+from profiling import span
 
-def init_db():
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+DATABASE_PATH = os.getenv("DATABASE_PATH", "faculty_hub.db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+# Milliseconds a connection waits for another process's write lock.
+BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))
+# Entries kept in faculty_changes; a process further behind reloads fully.
+CHANGE_LOG_SIZE = 10000
+
+# Applied to every pooled connection when it is opened.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT}",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+)
+
+_pool: Optional[asyncio.Queue] = None
+_connections: List[aiosqlite.Connection] = []
+_change_listeners: List[Callable[[int], None]] = []
+
+# Relative bm25 weight of each faculty_fts column, in declaration order.
+SEARCH_WEIGHTS = (10.0, 4.0, 4.0, 2.0, 1.0, 1.0, 1.0)
+
+async def _migrate_search_index(conn: aiosqlite.Connection):
+    # Only the string values of the JSON lists are indexed, so a search for
+    # "title" or "company" no longer matches every row.
+    await conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS faculty_fts USING fts5(
+            name, department, designation, headline,
+            experience, projects, publications,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    await conn.execute("""
+        CREATE VIEW IF NOT EXISTS faculty_search_doc AS
+        SELECT
+            f.id, f.name, f.department, f.designation, f.headline,
+            (SELECT group_concat(j.value, ' ') FROM json_tree(
+                CASE WHEN json_valid(f.experience) THEN f.experience END
+            ) j WHERE j.type = 'text') AS experience,
+            (SELECT group_concat(j.value, ' ') FROM json_tree(
+                CASE WHEN json_valid(f.projects) THEN f.projects END
+            ) j WHERE j.type = 'text') AS projects,
+            (SELECT group_concat(j.value, ' ') FROM json_tree(
+                CASE WHEN json_valid(f.publications) THEN f.publications END
+            ) j WHERE j.type = 'text') AS publications
+        FROM faculty f
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_insert AFTER INSERT ON faculty BEGIN
+            INSERT INTO faculty_fts (
+                rowid, name, department, designation, headline,
+                experience, projects, publications
+            ) SELECT * FROM faculty_search_doc WHERE id = new.id;
+        END
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_update AFTER UPDATE ON faculty BEGIN
+            DELETE FROM faculty_fts WHERE rowid = old.id;
+            INSERT INTO faculty_fts (
+                rowid, name, department, designation, headline,
+                experience, projects, publications
+            ) SELECT * FROM faculty_search_doc WHERE id = new.id;
+        END
+    """)
+    await conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_delete AFTER DELETE ON faculty BEGIN
+            DELETE FROM faculty_fts WHERE rowid = old.id;
+        END
+    """)
+    await conn.execute("DELETE FROM faculty_fts")
+    await conn.execute("""
+        INSERT INTO faculty_fts (
+            rowid, name, department, designation, headline,
+            experience, projects, publications
+        ) SELECT * FROM faculty_search_doc
+    """)
+
+async def _migrate_name_index(conn: aiosqlite.Connection):
+    # Backs ORDER BY name, id and the (name, id) keyset used for paging.
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_name_id ON faculty (name, id)")
+
+async def _migrate_unique_email(conn: aiosqlite.Connection):
+    duplicates = await conn.execute_fetchall("""
+        SELECT email FROM faculty WHERE email IS NOT NULL
+        GROUP BY email HAVING COUNT(*) > 1
+    """)
+    if duplicates:
+        emails = ", ".join(row[0] for row in duplicates)
+        raise RuntimeError(
+            f"Cannot add unique email index; resolve duplicate faculty emails first: {emails}"
+        )
+    # Bulk import upserts on email, which needs a unique index to conflict on.
+    await conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_faculty_email
+        ON faculty (email) WHERE email IS NOT NULL
+    """)
+
+# Each list field of a faculty profile lives in its own table, keyed by
+# faculty_id and kept in list order by sort_order.
+CHILD_TABLES = {
+    "experience": ("faculty_experience", ("position", "company", "duration")),
+    "certifications": ("faculty_certifications", ("name", "issuer")),
+    "projects": ("faculty_projects", ("title", "description")),
+    "publications": ("faculty_publications", ("title", "authors", "year", "citation", "cited_by")),
+}
+
+# Child tables whose text is part of faculty_search_doc.
+SEARCH_CHILD_TABLES = ("faculty_experience", "faculty_projects", "faculty_publications")
+
+# Columns added after the child tables were created; _migrate_child_tables
+# leaves them to the migrations that introduced them.
+LATER_CHILD_COLUMNS = {"cited_by"}
+
+def _original_columns(field: str) -> Tuple[str, ...]:
+    return tuple(column for column in CHILD_TABLES[field][1] if column not in LATER_CHILD_COLUMNS)
+
+# Fields the item models require; NULLs from old JSON rows are stored as ''.
+REQUIRED_CHILD_FIELDS = {"position", "company", "title", "name"}
+
+def _search_text(table: str, fields) -> str:
+    parts = " || ' ' || ".join(f"coalesce(c.{field}, '')" for field in fields)
+    return f"(SELECT group_concat({parts}, ' ') FROM {table} c WHERE c.faculty_id = f.id)"
+
+async def _migrate_child_tables(conn: aiosqlite.Connection):
+    # The search view and triggers read the JSON columns, so they go first.
+    for trigger in ("faculty_fts_insert", "faculty_fts_update", "faculty_fts_delete"):
+        await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    await conn.execute("DROP VIEW IF EXISTS faculty_search_doc")
+    
+    for field, (table, _) in CHILD_TABLES.items():
+        columns = _original_columns(field)
+        column_defs = ", ".join(
+            f"{column} TEXT NOT NULL" if column in REQUIRED_CHILD_FIELDS else f"{column} TEXT"
+            for column in columns
+        )
+        await conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                faculty_id INTEGER NOT NULL REFERENCES faculty (id) ON DELETE CASCADE,
+                sort_order INTEGER NOT NULL,
+                {column_defs}
+            )
+        """)
+        await conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table}_faculty
+            ON {table} (faculty_id, sort_order)
+        """)
+        
+        extracts = ", ".join(
+            f"coalesce(json_extract(j.value, '$.{column}'), '')"
+            if column in REQUIRED_CHILD_FIELDS else f"json_extract(j.value, '$.{column}')"
+            for column in columns
+        )
+        await conn.execute(f"""
+            INSERT INTO {table} (faculty_id, sort_order, {", ".join(columns)})
+            SELECT f.id, j.key, {extracts}
+            FROM faculty f, json_each(CASE WHEN json_valid(f.{field}) THEN f.{field} END) j
+            WHERE j.type = 'object'
+        """)
+        await conn.execute(f"ALTER TABLE faculty DROP COLUMN {field}")
+    
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_experience_company ON faculty_experience (company)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_publications_year ON faculty_publications (year)")
+    
+    await conn.execute(f"""
+        CREATE VIEW faculty_search_doc AS
+        SELECT
+            f.id, f.name, f.department, f.designation, f.headline,
+            {_search_text("faculty_experience", _original_columns("experience"))} AS experience,
+            {_search_text("faculty_projects", _original_columns("projects"))} AS projects,
+            {_search_text("faculty_publications", _original_columns("publications"))} AS publications
+        FROM faculty f
+    """)
+    refresh_document = """
+            DELETE FROM faculty_fts WHERE rowid = {id};
+            INSERT INTO faculty_fts (
+                rowid, name, department, designation, headline,
+                experience, projects, publications
+            ) SELECT * FROM faculty_search_doc WHERE id = {id};
+    """
+    await conn.execute(f"""
+        CREATE TRIGGER faculty_fts_insert AFTER INSERT ON faculty BEGIN
+            {refresh_document.format(id="new.id")}
+        END
+    """)
+    await conn.execute(f"""
+        CREATE TRIGGER faculty_fts_update
+        AFTER UPDATE OF name, department, designation, headline ON faculty BEGIN
+            {refresh_document.format(id="new.id")}
+        END
+    """)
+    await conn.execute("""
+        CREATE TRIGGER faculty_fts_delete AFTER DELETE ON faculty BEGIN
+            DELETE FROM faculty_fts WHERE rowid = old.id;
+        END
+    """)
+    for table in ("faculty_experience", "faculty_projects", "faculty_publications"):
+        await conn.execute(f"""
+            CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                {refresh_document.format(id="new.faculty_id")}
+            END
+        """)
+        await conn.execute(f"""
+            CREATE TRIGGER {table}_fts_update AFTER UPDATE ON {table} BEGIN
+                {refresh_document.format(id="new.faculty_id")}
+            END
+        """)
+        await conn.execute(f"""
+            CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                {refresh_document.format(id="old.faculty_id")}
+            END
+        """)
     
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS faculty (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            designation TEXT,
+    await conn.execute("DELETE FROM faculty_fts")
+    await conn.execute("""
+        INSERT INTO faculty_fts (
+            rowid, name, department, designation, headline,
+            experience, projects, publications
+        ) SELECT * FROM faculty_search_doc
+    """)
+
+async def _migrate_documents(conn: aiosqlite.Connection):
+    # Pre-rendered JSON for each profile, regenerated on every write so the
+    # read path never formats or encodes.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS faculty_documents (
+            faculty_id INTEGER PRIMARY KEY REFERENCES faculty (id) ON DELETE CASCADE,
+            document BLOB NOT NULL,
+            summary BLOB NOT NULL
+        )
+    """)
+
+async def _migrate_refresh_queue(conn: aiosqlite.Connection):
+    # Pending profile refreshes. A row exists at most once per faculty member;
+    # lease_until marks a job a worker is currently running.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS refresh_queue (
+            faculty_id INTEGER PRIMARY KEY REFERENCES faculty (id) ON DELETE CASCADE,
+            enqueued_at REAL NOT NULL,
+            next_attempt_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_until REAL,
+            last_error TEXT
+        )
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_refresh_queue_due
+        ON refresh_queue (next_attempt_at)
+    """)
+
+async def _migrate_last_checked(conn: aiosqlite.Connection):
+    # When a refresh last confirmed the profile, separate from last_updated
+    # so unchanged profiles don't have to be rewritten to count as fresh.
+    await conn.execute("ALTER TABLE faculty ADD COLUMN last_checked TEXT")
+
+async def _migrate_publication_citations(conn: aiosqlite.Connection):
+    # Google Scholar "cited by" count per publication.
+    await conn.execute("ALTER TABLE faculty_publications ADD COLUMN cited_by INTEGER")
+
+async def _migrate_refresh_runs(conn: aiosqlite.Connection):
+    # Fleet refresh runs. last_faculty_id is the checkpoint: every refreshable
+    # profile up to it has been processed, so an interrupted run resumes there.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS refresh_runs (
+            id INTEGER PRIMARY KEY,
             department TEXT,
-            office_location TEXT,
-            email TEXT,
-            google_scholar_url TEXT,
-            linkedin_url TEXT,
-            profile_picture_url TEXT,
-            headline TEXT,
-            experience TEXT,
-            certifications TEXT,
-            projects TEXT,
-            publications TEXT,
-            last_updated DATETIME
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
-
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+            status TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            last_faculty_id INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0,
+            unchanged INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            elapsed_seconds REAL NOT NULL DEFAULT 0,
+            failures TEXT NOT NULL DEFAULT '[]'
+        )
+    """)
+
+async def _migrate_source_hashes(conn: aiosqlite.Connection):
+    # JSON {url: sha256} of the pages a refresh last read for the profile.
+    # A source whose page still has the same hash is not parsed again.
+    await conn.execute("ALTER TABLE faculty ADD COLUMN source_hashes TEXT")
+
+async def _migrate_change_log(conn: aiosqlite.Connection):
+    # Every document write and freshness check appends the faculty id here,
+    # so each server process (and the fleet CLI) can find out what other
+    # processes changed since it last looked. meta.instance_id keeps ETags
+    # built from seq distinct from those of another database.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+    await conn.execute("""
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('instance_id', lower(hex(randomblob(4))))
+    """)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS faculty_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            faculty_id INTEGER NOT NULL
+        )
+    """)
+    log = f"""
+        INSERT INTO faculty_changes (faculty_id) VALUES ({{id}});
+        DELETE FROM faculty_changes
+        WHERE seq <= (SELECT max(seq) FROM faculty_changes) - {CHANGE_LOG_SIZE};
+    """
+    await conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS faculty_documents_log_insert AFTER INSERT ON faculty_documents BEGIN
+            {log.format(id="NEW.faculty_id")}
+        END
+    """)
+    await conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS faculty_documents_log_update AFTER UPDATE ON faculty_documents BEGIN
+            {log.format(id="NEW.faculty_id")}
+        END
+    """)
+    await conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS faculty_documents_log_delete AFTER DELETE ON faculty_documents BEGIN
+            {log.format(id="OLD.faculty_id")}
+        END
+    """)
+    await conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS faculty_checked_log AFTER UPDATE OF last_checked ON faculty BEGIN
+            {log.format(id="NEW.id")}
+        END
+    """)
+
+async def _migrate_leases(conn: aiosqlite.Connection):
+    # Named leases held by one process at a time, e.g. the refresh
+    # scheduler when several server workers share the database.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+
+async def _migrate_request_profiles(conn: aiosqlite.Connection):
+    # Admin request profiles, shared by all server workers.
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS request_profiles (
+            id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            profile TEXT NOT NULL
+        )
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_request_profiles_created
+        ON request_profiles (created_at)
+    """)
+
+async def _migrate_change_seq(conn: aiosqlite.Connection):
+    # faculty.change_seq is the faculty_changes seq of the profile's latest
+    # document write, and a tombstone keeps the seq at which a profile was
+    # deleted, so clients can ask for everything after a given seq. The
+    # document log triggers are recreated to stamp both. Existing rows are
+    # stamped by the re-render that follows every migration.
+    await conn.execute("ALTER TABLE faculty ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_change_seq ON faculty (change_seq)")
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS faculty_tombstones (
+            faculty_id INTEGER PRIMARY KEY,
+            change_seq INTEGER NOT NULL
+        )
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_faculty_tombstones_change_seq
+        ON faculty_tombstones (change_seq)
+    """)
+    log = f"""
+        INSERT INTO faculty_changes (faculty_id) VALUES ({{id}});
+        {{stamp}};
+        DELETE FROM faculty_changes
+        WHERE seq <= (SELECT max(seq) FROM faculty_changes) - {CHANGE_LOG_SIZE};
+    """
+    stamp = "UPDATE faculty SET change_seq = (SELECT max(seq) FROM faculty_changes) WHERE id = NEW.faculty_id"
+    for event in ("insert", "update", "delete"):
+        await conn.execute(f"DROP TRIGGER IF EXISTS faculty_documents_log_{event}")
+    await conn.execute(f"""
+        CREATE TRIGGER faculty_documents_log_insert AFTER INSERT ON faculty_documents BEGIN
+            {log.format(id="NEW.faculty_id", stamp=stamp)}
+        END
+    """)
+    await conn.execute(f"""
+        CREATE TRIGGER faculty_documents_log_update AFTER UPDATE ON faculty_documents BEGIN
+            {log.format(id="NEW.faculty_id", stamp=stamp)}
+        END
+    """)
+    # Documents are only deleted along with their faculty row.
+    await conn.execute(f"""
+        CREATE TRIGGER faculty_documents_log_delete AFTER DELETE ON faculty_documents BEGIN
+            {log.format(id="OLD.faculty_id", stamp='''
+                INSERT OR REPLACE INTO faculty_tombstones (faculty_id, change_seq)
+                VALUES (OLD.faculty_id, (SELECT max(seq) FROM faculty_changes))
+            ''')}
+        END
+    """)
+
+async def _migrate_photos(conn: aiosqlite.Connection):
+    # photo_hash names the locally cached copy of the profile picture (see
+    # photos.py); photo_source is the URL it was downloaded from, so the
+    # picture is only fetched again when profile_picture_url changes.
+    await conn.execute("ALTER TABLE faculty ADD COLUMN photo_hash TEXT")
+    await conn.execute("ALTER TABLE faculty ADD COLUMN photo_source TEXT")
+
+async def _migrate_filter_indexes(conn: aiosqlite.Connection):
+    # Listing filtered by department or designation reads these in (name, id)
+    # order, so a page needs no sort; has_publications probes
+    # idx_faculty_publications_faculty.
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_department ON faculty (department, name, id)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_designation ON faculty (designation, name, id)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_faculty_last_updated ON faculty (last_updated)")
+
+async def _migrate_row_version(conn: aiosqlite.Connection):
+    # Bumped by every write to a profile's fields or lists (not by
+    # bookkeeping such as last_checked or the cached photo), so writers can
+    # make an update conditional on the version they read.
+    await conn.execute("ALTER TABLE faculty ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+async def _migrate_drop_child_fts_triggers(conn: aiosqlite.Connection):
+    # Row-level triggers on the list tables rebuilt a profile's search row
+    # for every item written; _replace_children now does it once.
+    for table in SEARCH_CHILD_TABLES:
+        for event in ("insert", "update", "delete"):
+            await conn.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{event}")
+
+async def _merge_duplicate_emails(conn: aiosqlite.Connection):
+    # Profiles whose emails differ only in case (the exact-case index let
+    # bulk import create them) are merged into the most recently updated
+    # one: fields and lists it lacks are taken from the newest duplicate that
+    # has them, and the duplicates are then deleted.
+    rows = await conn.execute_fetchall("""
+        SELECT id, lower(email), last_updated FROM faculty
+        WHERE lower(email) IN (
+            SELECT lower(email) FROM faculty WHERE email IS NOT NULL
+            GROUP BY lower(email) HAVING count(*) > 1
+        )
+    """)
+    if not rows:
+        return
+    groups: Dict[str, List[Tuple[str, int]]] = {}
+    for faculty_id, email, last_updated in rows:
+        groups.setdefault(email, []).append((last_updated or "", faculty_id))
+    
+    fill = ", ".join(
+        f"{column} = coalesce(nullif(faculty.{column}, ''), duplicate.{column})"
+        for column in FACULTY_COLUMNS if column not in ("email", "last_updated")
+    )
+    keepers, removed = [], []
+    for group in groups.values():
+        (_, keeper), *duplicates = sorted(group, reverse=True)
+        duplicate_ids = [faculty_id for _, faculty_id in duplicates]
+        for duplicate in duplicate_ids:
+            await conn.execute(f"""
+                UPDATE faculty SET {fill}
+                FROM faculty AS duplicate WHERE faculty.id = ?1 AND duplicate.id = ?2
+            """, (keeper, duplicate))
+        for table, _ in CHILD_TABLES.values():
+            for duplicate in duplicate_ids:
+                await conn.execute(f"""
+                    UPDATE {table} SET faculty_id = ?1
+                    WHERE faculty_id = ?2 AND NOT EXISTS (SELECT 1 FROM {table} WHERE faculty_id = ?1)
+                """, (keeper, duplicate))
+        keepers.append(keeper)
+        removed += duplicate_ids
+    
+    # Anything still pointing at a duplicate goes with it through ON DELETE
+    # CASCADE; documents are re-rendered once migrations finish.
+    await conn.execute("DELETE FROM faculty WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(removed),))
+    await _refresh_search(conn, keepers)
+
+async def _migrate_email_case(conn: aiosqlite.Connection):
+    # Emails are unique regardless of case; the upsert conflicts on
+    # lower(email) as well.
+    await _merge_duplicate_emails(conn)
+    await conn.execute("DROP INDEX IF EXISTS idx_faculty_email")
+    await conn.execute("""
+        CREATE UNIQUE INDEX idx_faculty_email
+        ON faculty (lower(email)) WHERE email IS NOT NULL
+    """)
+
+# Applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    _migrate_search_index,
+    _migrate_name_index,
+    _migrate_unique_email,
+    _migrate_child_tables,
+    _migrate_documents,
+    _migrate_refresh_queue,
+    _migrate_last_checked,
+    _migrate_publication_citations,
+    _migrate_refresh_runs,
+    _migrate_source_hashes,
+    _migrate_change_log,
+    _migrate_leases,
+    _migrate_request_profiles,
+    _migrate_change_seq,
+    _migrate_photos,
+    _migrate_filter_indexes,
+    _migrate_row_version,
+    _migrate_drop_child_fts_triggers,
+    _migrate_email_case,
+]
+
+async def _connect() -> aiosqlite.Connection:
+    # IMMEDIATE takes the write lock when a write transaction starts, so a
+    # process waiting on another one's writes waits out busy_timeout instead
+    # of failing when its read snapshot turns out to be stale.
+    conn = await aiosqlite.connect(DATABASE_PATH, isolation_level="IMMEDIATE")
+    conn.row_factory = aiosqlite.Row
+    for pragma in PRAGMAS:
+        await conn.execute(pragma)
     return conn
 
-def create_faculty(data: Dict[str, Any]) -> int:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO faculty (
-            name, designation, department, office_location, email,
-            google_scholar_url, linkedin_url, profile_picture_url,
-            headline, experience, certifications, projects,
-            publications, last_updated
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+async def init_db():
+    global _pool
+    
+    conn = await _connect()
+    try:
+        # Several server workers may start at once; the first to take the
+        # write lock migrates and the rest then find user_version up to date.
+        await conn.execute("BEGIN IMMEDIATE")
+        # Original schema; everything since is applied by MIGRATIONS.
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS faculty (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                designation TEXT,
+                department TEXT,
+                office_location TEXT,
+                email TEXT,
+                google_scholar_url TEXT,
+                linkedin_url TEXT,
+                profile_picture_url TEXT,
+                headline TEXT,
+                experience TEXT,
+                certifications TEXT,
+                projects TEXT,
+                publications TEXT,
+                last_updated DATETIME
+            )
+        """)
+    
+        rows = await conn.execute_fetchall("PRAGMA user_version")
+        version = rows[0][0]
+        for index, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            await migration(conn)
+            await conn.execute(f"PRAGMA user_version = {index}")
+        if version < len(MIGRATIONS):
+            # Rendered once the schema is final, so documents pick up any
+            # columns the migrations added.
+            await _refresh_documents(conn)
+    
+        await conn.commit()
+    except BaseException:
+        # A failed migration (duplicate emails, say) must not leave the
+        # connection's thread keeping the process alive.
+        await conn.close()
+        raise
+    
+    _pool = asyncio.Queue()
+    _connections.append(conn)
+    _pool.put_nowait(conn)
+    for _ in range(POOL_SIZE - 1):
+        conn = await _connect()
+        _connections.append(conn)
+        _pool.put_nowait(conn)
+
+async def close_db():
+    global _pool
+    
+    _pool = None
+    while _connections:
+        await _connections.pop().close()
+
+@asynccontextmanager
+async def get_db_connection() -> AsyncIterator[aiosqlite.Connection]:
+    if _pool is None:
+        raise RuntimeError("Database pool is not initialised; call init_db() first")
+    
+    pool = _pool
+    with span("db"):
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a connection with a half-finished transaction.
+            if conn.in_transaction:
+                await conn.rollback()
+            pool.put_nowait(conn)
+
+class VersionConflict(Exception):
+    # A conditional write found the profile at a newer version.
+    def __init__(self, faculty_id: int, version: int):
+        super().__init__(f"faculty {faculty_id} was modified (now at version {version})")
+        self.faculty_id = faculty_id
+        self.version = version
+
+def add_change_listener(listener: Callable[[int], None]):
+    # Listeners are called with the faculty id after every committed write.
+    _change_listeners.append(listener)
+
+def _notify_change(faculty_id: int):
+    for listener in _change_listeners:
+        listener(faculty_id)
+
+FACULTY_COLUMNS = (
+    "name", "designation", "department", "office_location", "email",
+    "google_scholar_url", "linkedin_url", "profile_picture_url",
+    "headline", "last_updated"
+)
+
+def _faculty_params(data: Dict[str, Any]) -> Tuple:
+    return (
         data.get('name'),
         data.get('designation'),
         data.get('department'),
@@ -58,101 +644,727 @@ def create_faculty(data: Dict[str, Any]) -> int:
         data.get('linkedin_url'),
         data.get('profile_picture_url'),
         data.get('headline'),
-        json.dumps(data.get('experience', [])),
-        json.dumps(data.get('certifications', [])),
-        json.dumps(data.get('projects', [])),
-        json.dumps(data.get('publications', [])),
         data.get('last_updated', datetime.now().isoformat())
-    ))
+    )
+
+def _normalize_items(items: Optional[List[Dict[str, Any]]], columns) -> List[Dict[str, Any]]:
+    return [{column: item.get(column) for column in columns} for item in items or []]
+
+async def _attach_children(
+    conn: aiosqlite.Connection,
+    faculty: List[Dict[str, Any]],
+    all_rows: bool = False
+) -> List[Dict[str, Any]]:
+    # One query per child table for the whole batch. all_rows skips the id
+    # filter when the batch is the entire faculty table.
+    by_id = {f['id']: f for f in faculty}
+    for f in faculty:
+        for field in CHILD_TABLES:
+            f[field] = []
+    if not by_id:
+        return faculty
     
-    faculty_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    for field, (table, columns) in CHILD_TABLES.items():
+        select = f"SELECT faculty_id, {', '.join(columns)} FROM {table}"
+        if all_rows:
+            rows = await conn.execute_fetchall(f"{select} ORDER BY faculty_id, sort_order")
+        else:
+            rows = await conn.execute_fetchall(f"""
+                {select} WHERE faculty_id IN (SELECT value FROM json_each(?))
+                ORDER BY faculty_id, sort_order
+            """, (json.dumps(list(by_id)),))
+        for row in rows:
+            owner = by_id.get(row[0])
+            if owner is not None:
+                owner[field].append(dict(zip(columns, row[1:])))
+    return faculty
+
+async def _replace_children(
+    conn: aiosqlite.Connection,
+    lists_by_faculty: Dict[int, Dict[str, Any]],
+    existing: bool = True
+):
+    # Rewrites only the list fields present in each faculty's dict.
+    searched = set()
+    for field, (table, columns) in CHILD_TABLES.items():
+        targets = {
+            faculty_id: lists[field]
+            for faculty_id, lists in lists_by_faculty.items() if field in lists
+        }
+        if not targets:
+            continue
+        if existing:
+            await conn.execute(
+                f"DELETE FROM {table} WHERE faculty_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(targets)),)
+            )
+        await conn.executemany(f"""
+            INSERT INTO {table} (faculty_id, sort_order, {", ".join(columns)})
+            VALUES ({", ".join("?" for _ in range(len(columns) + 2))})
+        """, [
+            (faculty_id, index) + tuple(item[column] for column in columns)
+            for faculty_id, items in targets.items()
+            for index, item in enumerate(_normalize_items(items, columns))
+        ])
+        if table in SEARCH_CHILD_TABLES:
+            searched.update(targets)
+    if searched:
+        await _refresh_search(conn, searched)
+
+async def _refresh_search(conn: aiosqlite.Connection, faculty_ids: Iterable[int]):
+    # Rebuilds the faculty_fts rows of these profiles from faculty_search_doc.
+    ids = json.dumps(list(faculty_ids))
+    await conn.execute("DELETE FROM faculty_fts WHERE rowid IN (SELECT value FROM json_each(?))", (ids,))
+    await conn.execute("""
+        INSERT INTO faculty_fts (
+            rowid, name, department, designation, headline,
+            experience, projects, publications
+        ) SELECT * FROM faculty_search_doc WHERE id IN (SELECT value FROM json_each(?))
+    """, (ids,))
+
+async def _refresh_documents(conn: aiosqlite.Connection, faculty_ids: Optional[Iterable[int]] = None):
+    # Re-renders the stored documents for faculty_ids, or for every row.
+    if faculty_ids is None:
+        rows = await conn.execute_fetchall("SELECT * FROM faculty")
+    else:
+        rows = await conn.execute_fetchall(
+            "SELECT * FROM faculty WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(faculty_ids)),)
+        )
+    faculty = await _attach_children(conn, [dict(row) for row in rows], all_rows=faculty_ids is None)
+    await _store_documents(conn, faculty)
+
+async def _store_documents(conn: aiosqlite.Connection, faculty: List[Dict[str, Any]]):
+    # faculty are full profiles, with their lists attached.
+    with span("render"):
+        documents = [(f['id'], render_document(f), render_summary(f)) for f in faculty]
+    await conn.executemany("""
+        INSERT OR REPLACE INTO faculty_documents (faculty_id, document, summary)
+        VALUES (?, ?, ?)
+    """, documents)
+
+def _child_lists(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: data.get(field, []) for field in CHILD_TABLES}
+
+@timed(db_call_duration)
+async def create_faculty(data: Dict[str, Any]) -> int:
+    async with get_db_connection() as conn:
+        cursor = await conn.execute(f"""
+            INSERT INTO faculty ({", ".join(FACULTY_COLUMNS)})
+            VALUES ({", ".join("?" for _ in FACULTY_COLUMNS)})
+        """, _faculty_params(data))
+        
+        faculty_id = cursor.lastrowid
+        await _replace_children(conn, {faculty_id: _child_lists(data)}, existing=False)
+        await _refresh_documents(conn, [faculty_id])
+        await conn.commit()
+    _notify_change(faculty_id)
     return faculty_id
 
-def get_faculty(faculty_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@timed(db_call_duration)
+async def upsert_faculty_many(records: List[Dict[str, Any]]) -> List[Tuple[int, bool]]:
+    # Writes every record in one transaction. Records with an email update the
+    # existing row with that email, compared without case; the rest are
+    # inserted. Only the columns and lists present in a record are written,
+    # so an update leaves the others as they are. Returns (faculty_id,
+    # created) for each record, in input order.
+    emails = [data['email'].lower() for data in records if data.get('email')]
     
-    cursor.execute("SELECT * FROM faculty WHERE id = ?", (faculty_id,))
-    row = cursor.fetchone()
-    conn.close()
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(
+            "SELECT lower(email) FROM faculty WHERE lower(email) IN (SELECT value FROM json_each(?))",
+            (json.dumps(emails),)
+        )
+        existing = {row[0] for row in rows}
+        
+        # Consecutive records with the same columns share one statement;
+        # keeping input order means later rows for an email still win.
+        inserted_ids = []
+        signature = lambda data: (bool(data.get('email')), tuple(c for c in FACULTY_COLUMNS if c in data))
+        for (keyed, columns), group in groupby(records, key=signature):
+            params = [tuple(data[column] for column in columns) for data in group]
+            insert = f"""
+                INSERT INTO faculty ({", ".join(columns)})
+                VALUES ({", ".join("?" for _ in columns)})
+            """
+            if keyed:
+                updates = ", ".join([f"{column} = excluded.{column}" for column in columns] + ["version = version + 1"])
+                await conn.executemany(
+                    f"{insert} ON CONFLICT (lower(email)) WHERE email IS NOT NULL DO UPDATE SET {updates}", params
+                )
+            else:
+                for values in params:
+                    cursor = await conn.execute(insert, values)
+                    inserted_ids.append(cursor.lastrowid)
+        
+        rows = await conn.execute_fetchall(
+            "SELECT lower(email), id FROM faculty WHERE lower(email) IN (SELECT value FROM json_each(?))",
+            (json.dumps(emails),)
+        )
+        ids_by_email = {row[0]: row[1] for row in rows}
+        
+        results = []
+        unkeyed_ids = iter(inserted_ids)
+        for data in records:
+            email = (data.get('email') or '').lower()
+            if email:
+                results.append((ids_by_email[email], email not in existing))
+                existing.add(email)
+            else:
+                results.append((next(unkeyed_ids), True))
+        
+        lists: Dict[int, Dict[str, Any]] = {}
+        for (faculty_id, _), data in zip(results, records):
+            lists.setdefault(faculty_id, {}).update(
+                (field, data[field]) for field in CHILD_TABLES if field in data
+            )
+        await _replace_children(conn, lists)
+        await _refresh_documents(conn, {faculty_id for faculty_id, _ in results})
+        await conn.commit()
     
-    if row:
-        return dict(row)
-    return None
+    for faculty_id in {faculty_id for faculty_id, _ in results}:
+        _notify_change(faculty_id)
+    return results
 
-def get_all_faculty() -> List[Dict[str, Any]]:
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@timed(db_call_duration)
+async def get_faculty(faculty_id: int) -> Optional[Dict[str, Any]]:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT * FROM faculty WHERE id = ?", (faculty_id,))
+        if not rows:
+            return None
+        faculty = await _attach_children(conn, [dict(rows[0])])
     
-    cursor.execute("SELECT * FROM faculty ORDER BY name")
-    rows = cursor.fetchall()
-    conn.close()
+    return faculty[0]
+
+@timed(db_call_duration)
+async def get_documents(faculty_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    # The columns the read model needs alongside each pre-rendered document.
+    select = """
+        SELECT f.id, f.name, f.last_updated, f.last_checked, f.linkedin_url, f.google_scholar_url,
+               f.photo_hash, d.document, d.summary
+        FROM faculty f JOIN faculty_documents d ON d.faculty_id = f.id
+    """
+    async with get_db_connection() as conn:
+        if faculty_ids is None:
+            rows = await conn.execute_fetchall(f"{select} ORDER BY f.name, f.id")
+        else:
+            rows = await conn.execute_fetchall(
+                f"{select} WHERE f.id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(faculty_ids)),)
+            )
     
     return [dict(row) for row in rows]
 
-def update_faculty(faculty_id: int, data: Dict[str, Any]) -> bool:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        UPDATE faculty SET
-            name = ?, designation = ?, department = ?, office_location = ?,
-            email = ?, google_scholar_url = ?, linkedin_url = ?,
-            profile_picture_url = ?, headline = ?, experience = ?,
-            certifications = ?, projects = ?, publications = ?,
-            last_updated = ?
-        WHERE id = ?
-    """, (
-        data.get('name'),
-        data.get('designation'),
-        data.get('department'),
-        data.get('office_location'),
-        data.get('email'),
-        data.get('google_scholar_url'),
-        data.get('linkedin_url'),
-        data.get('profile_picture_url'),
-        data.get('headline'),
-        json.dumps(data.get('experience', [])),
-        json.dumps(data.get('certifications', [])),
-        json.dumps(data.get('projects', [])),
-        json.dumps(data.get('publications', [])),
-        data.get('last_updated', datetime.now().isoformat()),
-        faculty_id
-    ))
-    
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    return success
+# (kind, table, id column, text column) of each source of suggestions.
+SUGGEST_SOURCES = (
+    ("name", "faculty", "id", "name"),
+    ("department", "faculty", "id", "department"),
+    ("designation", "faculty", "id", "designation"),
+    ("project", "faculty_projects", "faculty_id", "title"),
+    ("publication", "faculty_publications", "faculty_id", "title"),
+)
 
-def delete_faculty(faculty_id: int) -> bool:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("DELETE FROM faculty WHERE id = ?", (faculty_id,))
+@timed(db_call_duration)
+async def get_suggest_terms(faculty_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, str, str]]:
+    # (faculty_id, kind, text) for every term the suggestion index covers.
+    selects = []
+    for kind, table, id_column, text_column in SUGGEST_SOURCES:
+        select = f"SELECT {id_column}, '{kind}', {text_column} FROM {table} WHERE {text_column} IS NOT NULL"
+        if faculty_ids is not None:
+            select += f" AND {id_column} IN (SELECT value FROM json_each(?1))"
+        selects.append(select)
+    params = (json.dumps(list(faculty_ids)),) if faculty_ids is not None else ()
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(" UNION ALL ".join(selects), params)
+    return [(row[0], row[1], row[2]) for row in rows]
+
+async def iter_faculty_batches(batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+    # Yields the whole table ordered by name, batch_size rows at a time with
+    # their child lists, so memory doesn't grow with the table. The export
+    # may be read as slowly as the client likes, so it uses a connection of
+    # its own rather than holding one from the pool; the open cursor keeps
+    # every batch on the same snapshot.
+    conn = await _connect()
+    try:
+        cursor = await conn.execute("SELECT * FROM faculty ORDER BY name, id")
+        while True:
+            rows = await cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield await _attach_children(conn, [dict(row) for row in rows])
+        await cursor.close()
+    finally:
+        await conn.close()
+
+# Columns a patch may write besides the lists.
+PATCH_COLUMNS = FACULTY_COLUMNS + ("source_hashes",)
+
+async def _patch_faculty(conn: aiosqlite.Connection, faculty_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Writes the columns and lists present in data and bumps the version in
+    # one UPDATE ... RETURNING. If data has a version, the row is only
+    # written while it is still at that version; VersionConflict otherwise.
+    # Returns the updated profile with its lists, or None if there is none.
+    columns = [column for column in PATCH_COLUMNS if column in data]
+    assignments = [f"{column} = ?" for column in columns] + ["version = version + 1"]
+    params = [data[column] for column in columns] + [faculty_id]
+    where = "id = ?"
+    if data.get('version') is not None:
+        where += " AND version = ?"
+        params.append(data['version'])
+    rows = await conn.execute_fetchall(
+        f"UPDATE faculty SET {', '.join(assignments)} WHERE {where} RETURNING *", params
+    )
     
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    if not rows:
+        if data.get('version') is not None:
+            current = await conn.execute_fetchall("SELECT version FROM faculty WHERE id = ?", (faculty_id,))
+            if current:
+                raise VersionConflict(faculty_id, current[0][0])
+        return None
+    faculty = (await _attach_children(conn, [dict(rows[0])]))[0]
+    # Only lists that actually changed are rewritten.
+    changed = {
+        field: items or [] for field, items in data.items()
+        if field in CHILD_TABLES and _normalize_items(items, CHILD_TABLES[field][1]) != faculty[field]
+    }
+    if changed:
+        await _replace_children(conn, {faculty_id: changed})
+        faculty = (await _attach_children(conn, [dict(rows[0])]))[0]
+    return faculty
+
+@timed(db_call_duration)
+async def patch_faculty(faculty_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # See _patch_faculty; also re-renders the profile's document.
+    async with get_db_connection() as conn:
+        faculty = await _patch_faculty(conn, faculty_id, data)
+        if faculty is not None:
+            await _store_documents(conn, [faculty])
+        await conn.commit()
+    if faculty is not None:
+        _notify_change(faculty_id)
+    return faculty
+
+@timed(db_call_duration)
+async def save_refresh_batch(
+    updates: Dict[int, Dict[str, Any]],
+    checked: Dict[int, str],
+    checked_at: str
+) -> List[int]:
+    # Writes a batch of refresh results in one transaction: patches for
+    # changed profiles, only last_checked and source_hashes for unchanged
+    # ones (checked maps id to source_hashes). Patches whose version no
+    # longer matches are skipped. Returns the ids written.
+    async with get_db_connection() as conn:
+        patched = []
+        for faculty_id, data in updates.items():
+            try:
+                faculty = await _patch_faculty(conn, faculty_id, data)
+            except VersionConflict:
+                faculty = None
+            if faculty is not None:
+                patched.append(faculty)
+        if patched:
+            await _store_documents(conn, patched)
+        written = [faculty['id'] for faculty in patched]
+        cursor = await conn.execute("""
+            UPDATE faculty SET last_checked = ?, source_hashes = c.value
+            FROM json_each(?) c WHERE faculty.id = CAST(c.key AS INTEGER)
+            RETURNING faculty.id
+        """, (checked_at, json.dumps(checked)))
+        written += [row[0] for row in await cursor.fetchall()]
+        await conn.commit()
+    for faculty_id in written:
+        _notify_change(faculty_id)
+    return written
+
+@timed(db_call_duration)
+async def get_pending_photos(faculty_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    # {id: profile_picture_url} for the profiles whose cached photo doesn't
+    # match their current picture; None where the picture was removed.
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("""
+            SELECT id, nullif(profile_picture_url, '') FROM faculty
+            WHERE id IN (SELECT value FROM json_each(?))
+              AND photo_source IS NOT nullif(profile_picture_url, '')
+        """, (json.dumps(list(faculty_ids)),))
+    return {row[0]: row[1] for row in rows}
+
+@timed(db_call_duration)
+async def save_photos(photos: Dict[int, Tuple[Optional[str], Optional[str]]]) -> List[str]:
+    # photos maps id to (photo_hash, source url). Rows whose picture changed
+    # again while it was being downloaded are skipped. Returns the replaced
+    # photo hashes that no profile uses any more.
+    async with get_db_connection() as conn:
+        await conn.execute("BEGIN IMMEDIATE")
+        rows = await conn.execute_fetchall("""
+            SELECT DISTINCT photo_hash FROM faculty
+            WHERE id IN (SELECT CAST(key AS INTEGER) FROM json_each(?)) AND photo_hash IS NOT NULL
+        """, (json.dumps(photos),))
+        replaced = [row[0] for row in rows]
+        cursor = await conn.execute("""
+            UPDATE faculty SET photo_hash = p.value ->> 0, photo_source = p.value ->> 1
+            FROM json_each(?) p
+            WHERE faculty.id = CAST(p.key AS INTEGER)
+              AND nullif(faculty.profile_picture_url, '') IS p.value ->> 1
+            RETURNING faculty.id
+        """, (json.dumps(photos),))
+        written = [row[0] for row in await cursor.fetchall()]
+        if written:
+            await _refresh_documents(conn, written)
+        rows = await conn.execute_fetchall("""
+            SELECT value FROM json_each(?)
+            WHERE value NOT IN (SELECT photo_hash FROM faculty WHERE photo_hash IS NOT NULL)
+        """, (json.dumps(replaced),))
+        await conn.commit()
+    for faculty_id in written:
+        _notify_change(faculty_id)
+    return [row[0] for row in rows]
+
+@timed(db_call_duration)
+async def mark_faculty_checked(faculty_id: int, checked_at: str, source_hashes: Optional[str] = None) -> bool:
+    async with get_db_connection() as conn:
+        cursor = await conn.execute(
+            "UPDATE faculty SET last_checked = ?, source_hashes = coalesce(?, source_hashes) WHERE id = ?",
+            (checked_at, source_hashes, faculty_id)
+        )
+        success = cursor.rowcount > 0
+        await conn.commit()
+    if success:
+        _notify_change(faculty_id)
+    return success
+
+@timed(db_call_duration)
+async def delete_faculty(faculty_id: int) -> bool:
+    async with get_db_connection() as conn:
+        # Child rows go with it through ON DELETE CASCADE.
+        cursor = await conn.execute("DELETE FROM faculty WHERE id = ?", (faculty_id,))
+        
+        success = cursor.rowcount > 0
+        await conn.commit()
+    if success:
+        _notify_change(faculty_id)
     return success
 
-def search_faculty(query: str) -> List[Dict[str, Any]]:
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@timed(db_call_duration)
+async def enqueue_refresh(faculty_id: int, due: float) -> bool:
+    # Returns False when the faculty member is already queued.
+    async with get_db_connection() as conn:
+        cursor = await conn.execute("""
+            INSERT INTO refresh_queue (faculty_id, enqueued_at, next_attempt_at)
+            SELECT id, ?, ? FROM faculty WHERE id = ?
+            ON CONFLICT (faculty_id) DO NOTHING
+        """, (due, due, faculty_id))
+        queued = cursor.rowcount > 0
+        await conn.commit()
+    return queued
+
+@timed(db_call_duration)
+async def claim_refresh_job(now: float, lease_seconds: float) -> Optional[Tuple[int, int]]:
+    # Atomically leases the most overdue job, so concurrent workers (and
+    # processes) never pick the same one. Returns (faculty_id, attempts).
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("""
+            UPDATE refresh_queue SET lease_until = ?
+            WHERE faculty_id = (
+                SELECT faculty_id FROM refresh_queue
+                WHERE next_attempt_at <= ? AND (lease_until IS NULL OR lease_until < ?)
+                ORDER BY next_attempt_at LIMIT 1
+            )
+            RETURNING faculty_id, attempts
+        """, (now + lease_seconds, now, now))
+        await conn.commit()
     
-    search_pattern = f"%{query}%"
-    cursor.execute("""
-        SELECT * FROM faculty
-        WHERE name LIKE ? OR department LIKE ? OR designation LIKE ?
-           OR headline LIKE ? OR experience LIKE ? OR projects LIKE ?
-           OR publications LIKE ?
-        ORDER BY name
-    """, (search_pattern, search_pattern, search_pattern, search_pattern,
-          search_pattern, search_pattern, search_pattern))
+    if rows:
+        return rows[0][0], rows[0][1]
+    return None
+
+@timed(db_call_duration)
+async def complete_refresh(faculty_id: int):
+    async with get_db_connection() as conn:
+        await conn.execute("DELETE FROM refresh_queue WHERE faculty_id = ?", (faculty_id,))
+        await conn.commit()
+
+@timed(db_call_duration)
+async def reschedule_refresh(faculty_id: int, next_attempt_at: float, attempts: int, error: Optional[str]):
+    async with get_db_connection() as conn:
+        await conn.execute("""
+            UPDATE refresh_queue
+            SET next_attempt_at = ?, attempts = ?, last_error = ?, lease_until = NULL
+            WHERE faculty_id = ?
+        """, (next_attempt_at, attempts, error, faculty_id))
+        await conn.commit()
+
+@timed(db_call_duration)
+async def count_refresh_queue() -> int:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT COUNT(*) FROM refresh_queue")
+    return rows[0][0]
+
+def _refreshable_filter(department: Optional[str]) -> Tuple[str, Tuple]:
+    where = "(linkedin_url IS NOT NULL OR google_scholar_url IS NOT NULL)"
+    if department is None:
+        return where, ()
+    return f"{where} AND department = ?", (department,)
+
+@timed(db_call_duration)
+async def count_refreshable_faculty(department: Optional[str] = None) -> int:
+    where, params = _refreshable_filter(department)
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(f"SELECT COUNT(*) FROM faculty WHERE {where}", params)
+    return rows[0][0]
+
+@timed(db_call_duration)
+async def get_refreshable_faculty(
+    after_id: int,
+    limit: int,
+    department: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    # Profiles with something to scrape, in id order from after_id on.
+    where, params = _refreshable_filter(department)
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(
+            f"SELECT * FROM faculty WHERE id > ? AND {where} ORDER BY id LIMIT ?",
+            (after_id,) + params + (limit,)
+        )
+        return await _attach_children(conn, [dict(row) for row in rows])
+
+REFRESH_RUN_COUNTERS = ("total", "processed", "updated", "unchanged", "failed")
+
+def _refresh_run(row) -> Dict[str, Any]:
+    run = dict(row)
+    run["failures"] = json.loads(run["failures"])
+    return run
+
+@timed(db_call_duration)
+async def create_refresh_run(department: Optional[str], total: int) -> Dict[str, Any]:
+    async with get_db_connection() as conn:
+        cursor = await conn.execute("""
+            INSERT INTO refresh_runs (department, status, started_at, total)
+            VALUES (?, 'running', ?, ?)
+            RETURNING *
+        """, (department, datetime.now().isoformat(), total))
+        row = await cursor.fetchone()
+        await conn.commit()
+    return _refresh_run(row)
+
+@timed(db_call_duration)
+async def get_refresh_run(run_id: int) -> Optional[Dict[str, Any]]:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT * FROM refresh_runs WHERE id = ?", (run_id,))
+    return _refresh_run(rows[0]) if rows else None
+
+@timed(db_call_duration)
+async def get_unfinished_refresh_run(department: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("""
+            SELECT * FROM refresh_runs
+            WHERE status != 'finished' AND department IS ?
+            ORDER BY id DESC LIMIT 1
+        """, (department,))
+    return _refresh_run(rows[0]) if rows else None
+
+@timed(db_call_duration)
+async def save_refresh_run(run: Dict[str, Any]):
+    async with get_db_connection() as conn:
+        await conn.execute(f"""
+            UPDATE refresh_runs
+            SET status = ?, finished_at = ?, last_faculty_id = ?, elapsed_seconds = ?, failures = ?,
+                {", ".join(f"{counter} = ?" for counter in REFRESH_RUN_COUNTERS)}
+            WHERE id = ?
+        """, (
+            run["status"], run["finished_at"], run["last_faculty_id"], run["elapsed_seconds"],
+            json.dumps(run["failures"])
+        ) + tuple(run[counter] for counter in REFRESH_RUN_COUNTERS) + (run["id"],))
+        await conn.commit()
+
+@timed(db_call_duration)
+async def get_change_state() -> Tuple[str, int]:
+    # (instance_id, latest change seq); read before loading everything so
+    # changes landing during the load are picked up by the next poll.
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("""
+            SELECT (SELECT value FROM meta WHERE key = 'instance_id'),
+                   (SELECT coalesce(max(seq), 0) FROM faculty_changes)
+        """)
+    return rows[0][0], rows[0][1]
+
+@timed(db_call_duration)
+async def get_changes(after_seq: int) -> Tuple[Optional[int], List[Tuple[int, int]]]:
+    # (oldest seq still logged, [(seq, faculty_id)] after after_seq). An
+    # oldest seq beyond after_seq + 1 means entries were pruned unseen.
+    async with get_db_connection() as conn:
+        oldest = await conn.execute_fetchall("SELECT min(seq) FROM faculty_changes")
+        rows = await conn.execute_fetchall(
+            "SELECT seq, faculty_id FROM faculty_changes WHERE seq > ? ORDER BY seq", (after_seq,)
+        )
+    return oldest[0][0], [(row[0], row[1]) for row in rows]
+
+@timed(db_call_duration)
+async def get_faculty_delta(after_seq: int) -> Tuple[int, List[bytes], List[int]]:
+    # (seq, documents, deleted ids) for the changes after after_seq, up to
+    # seq. seq is read first and both queries stop at it, so a write that
+    # commits in between is left whole for the next call.
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT coalesce(max(seq), 0) FROM faculty_changes")
+        seq = rows[0][0]
+        documents = await conn.execute_fetchall("""
+            SELECT d.document FROM faculty f JOIN faculty_documents d ON d.faculty_id = f.id
+            WHERE f.change_seq > ? AND f.change_seq <= ? ORDER BY f.change_seq
+        """, (after_seq, seq))
+        deleted = await conn.execute_fetchall("""
+            SELECT faculty_id FROM faculty_tombstones
+            WHERE change_seq > ? AND change_seq <= ? ORDER BY change_seq
+        """, (after_seq, seq))
+    return seq, [row[0] for row in documents], [row[0] for row in deleted]
+
+@timed(db_call_duration)
+async def acquire_lease(name: str, holder: str, now: float, ttl: float) -> bool:
+    # Takes the lease if it is free or expired, or renews it for its holder.
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("""
+            INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+            WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+            RETURNING holder
+        """, (name, holder, now + ttl, now))
+        await conn.commit()
+    return bool(rows)
+
+@timed(db_call_duration)
+async def release_lease(name: str, holder: str):
+    async with get_db_connection() as conn:
+        await conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+        await conn.commit()
+
+@timed(db_call_duration)
+async def save_request_profile(profile: Dict[str, Any], keep: int):
+    # Stores the profile and drops all but the newest `keep`.
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO request_profiles (id, created_at, profile) VALUES (?, ?, ?)",
+            (profile["id"], datetime.now().timestamp(), json.dumps(profile))
+        )
+        await conn.execute("""
+            DELETE FROM request_profiles WHERE id NOT IN (
+                SELECT id FROM request_profiles ORDER BY created_at DESC LIMIT ?
+            )
+        """, (keep,))
+        await conn.commit()
+
+@timed(db_call_duration)
+async def get_request_profiles() -> List[Dict[str, Any]]:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT profile FROM request_profiles ORDER BY created_at DESC")
+    return [json.loads(row[0]) for row in rows]
+
+@timed(db_call_duration)
+async def get_request_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall("SELECT profile FROM request_profiles WHERE id = ?", (profile_id,))
+    return json.loads(rows[0][0]) if rows else None
+
+def build_search_query(query: str) -> Optional[str]:
+    # Every word becomes a quoted prefix term, so FTS5 syntax typed by users
+    # (quotes, AND/OR, column filters) is matched literally.
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+# Narrows listings and searches. Several departments or designations match
+# any of them; updated_since is compared with last_updated as ISO text.
+class FacultyFilter(NamedTuple):
+    department: Tuple[str, ...] = ()
+    designation: Tuple[str, ...] = ()
+    has_publications: Optional[bool] = None
+    updated_since: Optional[str] = None
+
+NO_FILTER = FacultyFilter()
+FACET_FIELDS = ("department", "designation")
+
+def _in_clause(column: str, values: Tuple[str, ...]) -> Tuple[str, Tuple]:
+    # A single value keeps the (column, name, id) index usable for ordering.
+    if len(values) == 1:
+        return f"{column} = ?", values
+    return f"{column} IN (SELECT value FROM json_each(?))", (json.dumps(list(values)),)
+
+def _faculty_filter(filters: FacultyFilter, facet_fields: bool = True) -> Tuple[str, Tuple]:
+    # WHERE clause over faculty f; facet_fields=False leaves out the
+    # department and designation conditions, which get_facet_counts applies
+    # itself.
+    clauses, params = ["1"], ()
+    if facet_fields:
+        for field in FACET_FIELDS:
+            if getattr(filters, field):
+                clause, values = _in_clause(f"f.{field}", getattr(filters, field))
+                clauses.append(clause)
+                params += values
+    if filters.has_publications is not None:
+        exists = "EXISTS (SELECT 1 FROM faculty_publications p WHERE p.faculty_id = f.id)"
+        clauses.append(exists if filters.has_publications else f"NOT {exists}")
+    if filters.updated_since is not None:
+        # As a subquery, so recent changes are found through
+        # idx_faculty_last_updated rather than by walking the name index.
+        clauses.append("f.id IN (SELECT id FROM faculty WHERE last_updated >= ?)")
+        params += (filters.updated_since,)
+    return " AND ".join(clauses), params
+
+@timed(db_call_duration)
+async def search_faculty_ids(match: str, filters: FacultyFilter = NO_FILTER) -> List[int]:
+    # `match` is an FTS5 expression from build_search_query.
+    where, params = _faculty_filter(filters)
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(f"""
+            SELECT faculty_fts.rowid FROM faculty_fts
+            JOIN faculty f ON f.id = faculty_fts.rowid
+            WHERE faculty_fts MATCH ? AND {where}
+            ORDER BY bm25(faculty_fts, {", ".join(map(str, SEARCH_WEIGHTS))})
+        """, (match,) + params)
     
-    rows = cursor.fetchall()
-    conn.close()
+    return [row[0] for row in rows]
+
+@timed(db_call_duration)
+async def filter_faculty_keys(filters: FacultyFilter) -> List[Tuple[str, int]]:
+    # (name, id) of the matching profiles, in listing order.
+    where, params = _faculty_filter(filters)
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(
+            f"SELECT f.name, f.id FROM faculty f WHERE {where} ORDER BY f.name, f.id", params
+        )
+    return [(row[0], row[1]) for row in rows]
+
+@timed(db_call_duration)
+async def get_facet_counts(filters: FacultyFilter, match: Optional[str] = None) -> Dict[str, Any]:
+    # One aggregate over (department, designation) pairs gives both facets.
+    # Each facet counts the profiles matching every other filter, so picking
+    # a department still shows how many profiles the other departments have.
+    where, params = _faculty_filter(filters, facet_fields=False)
+    if match is not None:
+        where += " AND f.id IN (SELECT rowid FROM faculty_fts WHERE faculty_fts MATCH ?)"
+        params += (match,)
+    async with get_db_connection() as conn:
+        rows = await conn.execute_fetchall(f"""
+            SELECT f.department, f.designation, count(*) FROM faculty f
+            WHERE {where}
+            GROUP BY f.department, f.designation
+        """, params)
     
-    return [dict(row) for row in rows]
+    total = 0
+    counts = {field: {} for field in FACET_FIELDS}
+    for department, designation, count in rows:
+        in_department = not filters.department or department in filters.department
+        in_designation = not filters.designation or designation in filters.designation
+        if in_designation and department:
+            counts["department"][department] = counts["department"].get(department, 0) + count
+        if in_department and designation:
+            counts["designation"][designation] = counts["designation"].get(designation, 0) + count
+        if in_department and in_designation:
+            total += count
+    facets = {
+        field: [
+            {"value": value, "count": count}
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))
+        ]
+        for field, values in counts.items()
+    }
+    return {"total": total, "facets": facets}
@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from pydantic import ValidationError
+
+from models import FacultyResponse
+
+# Fields the directory cards need; the summary view is projected from these.
+SUMMARY_FIELDS = ("id", "name", "designation", "department", "profile_picture_url", "photo_url", "headline")
+
+def photo_url(faculty_data: dict) -> Optional[str]:
+    # The hash in the query string changes with the picture, which is what
+    # lets the photo endpoint mark responses immutable.
+    photo_hash = faculty_data.get("photo_hash")
+    if not photo_hash:
+        return None
+    return f"/api/faculty/{faculty_data['id']}/photo?v={photo_hash[:16]}"
+
+def format_faculty_response(faculty_data: dict) -> dict:
+    return {
+        "id": faculty_data["id"],
+        "name": faculty_data["name"],
+        "designation": faculty_data["designation"],
+        "department": faculty_data["department"],
+        "office_location": faculty_data["office_location"],
+        "email": faculty_data["email"],
+        "google_scholar_url": faculty_data["google_scholar_url"],
+        "linkedin_url": faculty_data["linkedin_url"],
+        "profile_picture_url": faculty_data["profile_picture_url"],
+        "photo_url": photo_url(faculty_data),
+        "headline": faculty_data["headline"],
+        "experience": faculty_data["experience"],
+        "certifications": faculty_data["certifications"],
+        "projects": faculty_data["projects"],
+        "publications": faculty_data["publications"],
+        "last_updated": faculty_data["last_updated"],
+        "version": faculty_data.get("version")
+    }
+
+def render_document(faculty_data: Dict[str, Any]) -> bytes:
+    # Validated and encoded once per write by pydantic-core, so readers can
+    # send the stored bytes as-is.
+    formatted = format_faculty_response(faculty_data)
+    try:
+        return FacultyResponse(**formatted).model_dump_json().encode()
+    except ValidationError:
+        # Rows written before validation existed (e.g. a malformed email)
+        # are still served rather than failing the whole directory.
+        return json.dumps(formatted, ensure_ascii=False, separators=(",", ":")).encode()
+
+def render_summary(faculty_data: Dict[str, Any]) -> bytes:
+    faculty_data = dict(faculty_data, photo_url=photo_url(faculty_data))
+    summary = {field: faculty_data[field] for field in SUMMARY_FIELDS}
+    return json.dumps(summary, ensure_ascii=False, separators=(",", ":")).encode()
+
+def json_array(documents: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(documents) + b"]"
@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import FacultyUpdate
+
+# Accepted CSV headers and the field each one maps to. Mirrors the column
+# names documented in CSV_IMPORT_GUIDE.md.
+COLUMN_ALIASES = {
+    'name': 'name',
+    'title': 'designation',
+    'designation': 'designation',
+    'department': 'department',
+    'office_location': 'office_location',
+    'office': 'office_location',
+    'email': 'email',
+    'linkedin_url': 'linkedin_url',
+    'linkedin': 'linkedin_url',
+    'google_scholar_url': 'google_scholar_url',
+    'scholar_url': 'google_scholar_url',
+    'scholar': 'google_scholar_url',
+    'headline': 'headline',
+    'profile_picture_url': 'profile_picture_url',
+    'picture_url': 'profile_picture_url',
+    'photo_url': 'profile_picture_url',
+    'experience': 'experience',
+    'projects': 'projects',
+    'certifications': 'certifications',
+}
+
+# List columns use `|` between the parts of an entry and `;` between entries.
+# The first parts are required by the item models, so they default to "".
+LIST_COLUMNS = {
+    'experience': (('position', True), ('company', True), ('duration', False)),
+    'projects': (('title', True), ('description', False)),
+    'certifications': (('name', True), ('issuer', False)),
+}
+
+ParsedRow = Tuple[int, Optional[FacultyUpdate], List[str]]
+
+def parse_list_cell(value: str, parts_spec) -> List[Dict[str, Optional[str]]]:
+    items = []
+    for entry in value.split(';'):
+        if not entry.strip():
+            continue
+        parts = [part.strip() for part in entry.split('|')]
+        item = {}
+        for index, (key, required) in enumerate(parts_spec):
+            part = parts[index] if index < len(parts) else ''
+            item[key] = part if part or required else None
+        items.append(item)
+    return items
+
+def csv_row_to_faculty(row: Dict[str, str]) -> Dict[str, Any]:
+    faculty = {}
+    for header, value in row.items():
+        field = COLUMN_ALIASES.get((header or '').strip().lower())
+        if field is None or value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        if field in LIST_COLUMNS:
+            faculty[field] = parse_list_cell(value, LIST_COLUMNS[field])
+        else:
+            faculty[field] = value
+    return faculty
+
+def _validate(line: int, data: Any) -> ParsedRow:
+    if not isinstance(data, dict):
+        return line, None, ["Row must be an object"]
+    try:
+        return line, FacultyUpdate(**data), []
+    except ValidationError as e:
+        errors = [
+            f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+        return line, None, errors
+
+def iter_csv_rows(text: io.TextIOBase) -> Iterator[ParsedRow]:
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield _validate(reader.line_num, csv_row_to_faculty(row))
+
+def iter_ndjson_rows(text: io.TextIOBase) -> Iterator[ParsedRow]:
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, None, [f"Invalid JSON: {e.msg}"]
+            continue
+        yield _validate(line, data)
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    filename = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if filename.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return 'csv'
+
+def read_faculty_rows(stream: BinaryIO, fmt: str) -> Iterator[ParsedRow]:
+    # Rows are decoded and validated one at a time, so the upload never has to
+    # be held in memory as text.
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(text)
+    return iter_csv_rows(text)
+
+# Export writes the template columns from CSV_IMPORT_GUIDE.md, so an export
+# can be edited and imported again. Publications are left out: titles and
+# citations routinely contain `;` and `|`. Importing the CSV keeps the stored
+# ones, and NDJSON rows carry every FacultyUpdate field, publications included.
+CSV_EXPORT_COLUMNS = (
+    'name', 'designation', 'department', 'office_location', 'email',
+    'linkedin_url', 'google_scholar_url', 'headline', 'profile_picture_url',
+    'experience', 'projects', 'certifications',
+)
+NDJSON_EXPORT_FIELDS = tuple(FacultyUpdate.model_fields)
+
+def format_list_cell(items: List[Dict[str, Any]], parts_spec) -> str:
+    entries = []
+    for item in items:
+        parts = [item.get(key) or '' for key, _ in parts_spec]
+        while parts and not parts[-1]:
+            parts.pop()
+        entries.append('|'.join(parts))
+    return ';'.join(entries)
+
+def faculty_to_csv_row(faculty: Dict[str, Any]) -> List[str]:
+    row = []
+    for column in CSV_EXPORT_COLUMNS:
+        if column in LIST_COLUMNS:
+            row.append(format_list_cell(faculty.get(column) or [], LIST_COLUMNS[column]))
+        else:
+            row.append(faculty.get(column) or '')
+    return row
+
+def csv_lines(batch: List[Dict[str, Any]], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_EXPORT_COLUMNS)
+    writer.writerows(faculty_to_csv_row(faculty) for faculty in batch)
+    return buffer.getvalue()
+
+def ndjson_lines(batch: List[Dict[str, Any]]) -> str:
+    return ''.join(
+        json.dumps({field: faculty.get(field) for field in NDJSON_EXPORT_FIELDS}) + '\n'
+        for faculty in batch
+    )
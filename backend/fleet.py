@@ -0,0 +1,207 @@
+"""Refresh every faculty profile (or one department) from the command line.
+
+Usage (from backend/):
+    python fleet.py [--department "Computer Science"] [--concurrency 8] [--batch-size 50] [--restart]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from database import (
+    acquire_lease, close_db, count_refreshable_faculty, create_refresh_run, enqueue_refresh,
+    get_refreshable_faculty, get_unfinished_refresh_run, init_db, release_lease,
+    save_refresh_batch, save_refresh_run
+)
+from photos import sync_photos
+from refresh import (
+    PROCESS_ID, REFRESH_BACKOFF_BASE, HostUnavailable, profile_changed, refresh_changes,
+    refresh_scheduler
+)
+
+logger = logging.getLogger(__name__)
+
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "8"))
+# Profiles scraped, then written in one transaction and checkpointed.
+FLEET_BATCH_SIZE = int(os.getenv("FLEET_BATCH_SIZE", "50"))
+# Failures listed in the report; the counter still covers all of them.
+MAX_REPORTED_FAILURES = 100
+# A run is owned through a lease per department, renewed while it works.
+# Another process (server worker or CLI) may only resume it once the lease
+# has expired, i.e. the owner stopped renewing it.
+RUN_LEASE_TTL = 60.0
+
+class RunInProgress(Exception):
+    pass
+
+_active_run: Optional[asyncio.Task] = None
+
+ScrapeResult = Tuple[Optional[dict], Optional[str], Optional[float]]
+
+def run_report(run: Dict[str, Any]) -> Dict[str, Any]:
+    elapsed = run["elapsed_seconds"]
+    return dict(run, profiles_per_minute=round(run["processed"] / elapsed * 60, 1) if elapsed else 0.0)
+
+def _run_lease(department: Optional[str]) -> str:
+    return f"refresh-run:{department or ''}"
+
+async def start_refresh_run(department: Optional[str] = None, resume: bool = True) -> Dict[str, Any]:
+    # Picks up the last unfinished run for the same department unless told
+    # to start over. execute_refresh_run releases the lease taken here.
+    lease = _run_lease(department)
+    if not await acquire_lease(lease, PROCESS_ID, time.time(), RUN_LEASE_TTL):
+        raise RunInProgress("A refresh run for this department is in progress in another process")
+    try:
+        run = await get_unfinished_refresh_run(department) if resume else None
+        if run is None:
+            run = await create_refresh_run(department, await count_refreshable_faculty(department))
+    except BaseException:
+        await release_lease(lease, PROCESS_ID)
+        raise
+    run["status"] = "running"
+    return run
+
+async def _hold_lease(lease: str):
+    # Heartbeat for a running run; returns once another process holds the lease.
+    while True:
+        await asyncio.sleep(RUN_LEASE_TTL / 4)
+        try:
+            if not await acquire_lease(lease, PROCESS_ID, time.time(), RUN_LEASE_TTL):
+                return
+        except Exception as e:
+            logger.error(f"Could not renew the refresh run lease: {e}")
+
+async def _scrape(faculty: dict, slots: asyncio.Semaphore) -> ScrapeResult:
+    # Returns (update_data, error, retry_at).
+    from scraper import ScrapeBlocked
+    async with slots:
+        try:
+            return await refresh_scheduler.scrape(faculty), None, None
+        except HostUnavailable as e:
+            return None, str(e), e.open_until
+        except ScrapeBlocked as e:
+            return None, str(e), refresh_scheduler.breaker(e.host).open_until
+        except Exception as e:
+            return None, str(e) or type(e).__name__, time.time() + REFRESH_BACKOFF_BASE
+
+async def execute_refresh_run(
+    run: Dict[str, Any],
+    concurrency: int = FLEET_CONCURRENCY,
+    batch_size: int = FLEET_BATCH_SIZE
+) -> Dict[str, Any]:
+    slots = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+    elapsed_before = run["elapsed_seconds"]
+    lease = _run_lease(run["department"])
+    heartbeat = asyncio.create_task(_hold_lease(lease))
+
+    try:
+        while True:
+            if heartbeat.done():
+                raise RunInProgress(f"Refresh run {run['id']} was taken over by another process")
+            batch = await get_refreshable_faculty(run["last_faculty_id"], batch_size, run["department"])
+            if not batch:
+                break
+            results = await asyncio.gather(*(_scrape(faculty, slots) for faculty in batch))
+
+            updates: Dict[int, dict] = {}
+            checked: Dict[int, str] = {}
+            for faculty, (update_data, error, retry_at) in zip(batch, results):
+                if error is not None:
+                    run["failed"] += 1
+                    if len(run["failures"]) < MAX_REPORTED_FAILURES:
+                        run["failures"].append({"faculty_id": faculty["id"], "name": faculty["name"], "error": error})
+                    # Handed to the refresh queue, which retries with backoff.
+                    await enqueue_refresh(faculty["id"], retry_at)
+                elif profile_changed(faculty, update_data):
+                    updates[faculty["id"]] = refresh_changes(faculty, update_data)
+                else:
+                    checked[faculty["id"]] = update_data["source_hashes"]
+
+            written = set(await save_refresh_batch(updates, checked, datetime.now().isoformat()))
+            for faculty_id in set(updates) - written:
+                # Edited (or deleted) while being scraped; the refresh queue
+                # scrapes it again from the current version.
+                await enqueue_refresh(faculty_id, time.time())
+            await sync_photos(written)
+            run["updated"] += len(written.intersection(updates))
+            run["unchanged"] += len(written.intersection(checked))
+            run["processed"] += len(batch)
+            run["last_faculty_id"] = batch[-1]["id"]
+            run["elapsed_seconds"] = elapsed_before + time.monotonic() - started
+            await save_refresh_run(run)
+
+            report = run_report(run)
+            logger.info(
+                f"Refresh run {run['id']}: {run['processed']}/{run['total']} profiles, "
+                f"{run['failed']} failed, {report['profiles_per_minute']}/min"
+            )
+
+        run["status"] = "finished"
+        run["finished_at"] = datetime.now().isoformat()
+    except asyncio.CancelledError:
+        # The checkpoint is already saved; the next run resumes from it.
+        run["status"] = "interrupted"
+        raise
+    except Exception:
+        run["status"] = "failed"
+        raise
+    finally:
+        run["elapsed_seconds"] = elapsed_before + time.monotonic() - started
+        await save_refresh_run(run)
+        heartbeat.cancel()
+        # Only deletes the lease while this process still holds it.
+        await release_lease(lease, PROCESS_ID)
+
+    return run_report(run)
+
+def active_run() -> Optional[asyncio.Task]:
+    return _active_run if _active_run is not None and not _active_run.done() else None
+
+async def start_background_run(department: Optional[str] = None, resume: bool = True) -> Dict[str, Any]:
+    # One fleet run per process; the caller checks active_run() first.
+    global _active_run
+    run = await start_refresh_run(department, resume)
+    _active_run = asyncio.create_task(execute_refresh_run(run))
+    _active_run.add_done_callback(_log_run_result)
+    return run_report(run)
+
+def _log_run_result(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Refresh run failed: {task.exception()}")
+
+async def stop_background_run():
+    task = active_run()
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--department")
+    parser.add_argument("--concurrency", type=int, default=FLEET_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=FLEET_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore any unfinished run and start over")
+    args = parser.parse_args()
+
+    await init_db()
+    try:
+        try:
+            run = await start_refresh_run(args.department, resume=not args.restart)
+        except RunInProgress as e:
+            raise SystemExit(str(e))
+        if run["processed"]:
+            logger.info(f"Resuming refresh run {run['id']} after {run['processed']} profiles")
+        report = await execute_refresh_run(run, args.concurrency, args.batch_size)
+        print(json.dumps(report, indent=2))
+    finally:
+        from scraper import close_client
+        await close_client()
+        await close_db()
+
+if __name__ == "__main__":
+    asyncio.run(main())
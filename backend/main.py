@@ -1,20 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import (
+    BackgroundTasks, FastAPI, HTTPException, Depends, Query, Request, Response, UploadFile, File
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
 from datetime import datetime, timedelta
+import base64
+import csv
 import json
-from typing import List
+import os
+import sqlite3
+import sys
+from typing import List, Optional, Tuple, Union
 import asyncio
 
 from models import (
-    FacultyCreate, FacultyUpdate, FacultyResponse,
-    AdminLogin, Token, ScrapedData
+    FacultyCreate, FacultyUpdate, FacultyPatch, FacultyResponse, FacultyChanges, FacultyResults, Suggestion,
+    AdminLogin, Token, ScrapedData, BulkImportReport, RefreshRunReport, RequestProfile
 )
 from database import (
-    init_db, create_faculty, get_faculty, get_all_faculty,
-    update_faculty, delete_faculty, search_faculty
+    init_db, close_db, create_faculty, get_faculty,
+    patch_faculty, delete_faculty, upsert_faculty_many, get_refresh_run, iter_faculty_batches,
+    save_request_profile, get_request_profiles, get_request_profile, get_faculty_delta,
+    NO_FILTER, FacultyFilter, VersionConflict
 )
-from auth import verify_password, create_access_token, verify_token
-from scraper import scrape_faculty_data
+from faculty_csv import csv_lines, detect_format, ndjson_lines, read_faculty_rows
+from documents import format_faculty_response, json_array
+from read_model import read_model
+from auth import verify_password, create_access_token, verify_token, is_admin_token
+from refresh import refresh_scheduler
+from fleet import RunInProgress, active_run, run_report, start_background_run, stop_background_run
+import metrics
+from profiling import ProfilingMiddleware, span
+from photos import THUMBNAIL_SIZES, photo_path, sync_photos
 
 app = FastAPI(title="Faculty Hub API")
 
@@ -24,64 +42,139 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+# Requests sending an admin token in X-Profile-Token are profiled.
+app.add_middleware(ProfilingMiddleware, authorize=is_admin_token, store=save_request_profile)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_SUGGESTIONS = 20
 
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    await init_db()
+    refresh_scheduler.start()
+    metrics.start_exporter()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_background_run()
+    await refresh_scheduler.stop()
+    await metrics.stop_exporter()
+    # The scraper is imported on first use; nothing to close otherwise.
+    if "scraper" in sys.modules:
+        await sys.modules["scraper"].close_client()
+    await close_db()
+
+def etag_for(version: int) -> str:
+    return f'"{read_model.instance_id}-{version}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def json_bytes_response(content: bytes, etag: str, headers: Optional[dict] = None) -> Response:
+    # no-cache lets browsers and proxies store the body but revalidate it
+    # with If-None-Match on every use.
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+def encode_cursor(name: str, faculty_id: int) -> str:
+    raw = json.dumps([name, faculty_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-def parse_json_field(field_value):
-    if field_value:
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, faculty_id = json.loads(raw)
+        return str(name), int(faculty_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_change_cursor(cursor: str) -> Tuple[str, int]:
+    instance_id, _, seq = cursor.rpartition("-")
+    if not instance_id or not seq.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return instance_id, int(seq)
+
+def faculty_filter(
+    department: List[str] = Query([]),
+    designation: List[str] = Query([]),
+    has_publications: Optional[bool] = None,
+    updated_since: Optional[str] = None
+) -> FacultyFilter:
+    # Shared by the listing and search endpoints. department and designation
+    # may be repeated to match any of several values.
+    if updated_since is not None:
         try:
-            return json.loads(field_value)
-        except:
-            return []
-    return []
+            since = datetime.fromisoformat(updated_since.replace("Z", "+00:00"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="updated_since must be an ISO 8601 date or time")
+        # last_updated is stored as local time without an offset.
+        if since.tzinfo is not None:
+            since = since.astimezone().replace(tzinfo=None)
+        updated_since = since.isoformat()
+    return FacultyFilter(
+        department=tuple(sorted(set(filter(None, department)))),
+        designation=tuple(sorted(set(filter(None, designation)))),
+        has_publications=has_publications,
+        updated_since=updated_since
+    )
+
+def with_facets(documents: List[bytes], facets: dict) -> bytes:
+    # The facets=true envelope: {"faculty": [...], "total": n, "facets": {...}}.
+    return b"".join((
+        b'{"faculty":', json_array(documents),
+        b',"total":', str(facets["total"]).encode(),
+        b',"facets":', json.dumps(facets["facets"], ensure_ascii=False).encode(), b"}"
+    ))
 
-def format_faculty_response(faculty_data: dict) -> dict:
+def faculty_update_to_data(faculty: FacultyUpdate) -> dict:
     return {
-        "id": faculty_data["id"],
-        "name": faculty_data["name"],
-        "designation": faculty_data["designation"],
-        "department": faculty_data["department"],
-        "office_location": faculty_data["office_location"],
-        "email": faculty_data["email"],
-        "google_scholar_url": faculty_data["google_scholar_url"],
-        "linkedin_url": faculty_data["linkedin_url"],
-        "profile_picture_url": faculty_data["profile_picture_url"],
-        "headline": faculty_data["headline"],
-        "experience": parse_json_field(faculty_data["experience"]),
-        "certifications": parse_json_field(faculty_data["certifications"]),
-        "projects": parse_json_field(faculty_data["projects"]),
-        "publications": parse_json_field(faculty_data["publications"]),
-        "last_updated": faculty_data["last_updated"]
+        "name": faculty.name,
+        "designation": faculty.designation,
+        "department": faculty.department,
+        "office_location": faculty.office_location,
+        "email": faculty.email,
+        "google_scholar_url": faculty.google_scholar_url,
+        "linkedin_url": faculty.linkedin_url,
+        "profile_picture_url": faculty.profile_picture_url,
+        "headline": faculty.headline,
+        "experience": [exp.dict() for exp in faculty.experience] if faculty.experience else [],
+        "certifications": [cert.dict() for cert in faculty.certifications] if faculty.certifications else [],
+        "projects": [proj.dict() for proj in faculty.projects] if faculty.projects else [],
+        "publications": [pub.dict() for pub in faculty.publications] if faculty.publications else [],
+        "last_updated": datetime.now().isoformat()
     }
 
-async def background_scrape_and_update(faculty_id: int, linkedin_url: str, scholar_url: str):
-    try:
-        scraped_data = await scrape_faculty_data(linkedin_url, scholar_url)
-        
-        faculty = get_faculty(faculty_id)
-        if faculty:
-            update_data = {
-                "name": faculty["name"],
-                "designation": faculty["designation"],
-                "department": faculty["department"],
-                "office_location": faculty["office_location"],
-                "email": faculty["email"],
-                "google_scholar_url": faculty["google_scholar_url"],
-                "linkedin_url": faculty["linkedin_url"],
-                "profile_picture_url": scraped_data.get("profile_picture_url") or faculty["profile_picture_url"],
-                "headline": scraped_data.get("headline") or faculty["headline"],
-                "experience": scraped_data.get("experience", []),
-                "certifications": scraped_data.get("certifications", []),
-                "projects": scraped_data.get("projects", []),
-                "publications": scraped_data.get("publications", []),
-                "last_updated": datetime.now().isoformat()
-            }
-            update_faculty(faculty_id, update_data)
-    except Exception as e:
-        print(f"Background scrape failed: {e}")
+def faculty_fields_to_data(faculty: Union[FacultyPatch, FacultyUpdate]) -> dict:
+    # Only the fields the client sent (or an import row contained), so a
+    # partial update leaves the rest of the profile alone.
+    data = faculty.model_dump(exclude_unset=True)
+    if "name" in data and not data["name"]:
+        raise HTTPException(status_code=400, detail="name cannot be empty")
+    for field in ("experience", "certifications", "projects", "publications"):
+        if field in data:
+            data[field] = data[field] or []
+    data["last_updated"] = datetime.now().isoformat()
+    return data
+
+def version_conflict(sent: int, current: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Faculty was modified since version {sent} (now {current}); reload and try again"
+    )
 
 @app.post("/api/admin/login", response_model=Token)
 async def admin_login(login_data: AdminLogin):
@@ -97,101 +190,344 @@ async def scrape_preview(
     scholar_url: str = None,
     admin=Depends(verify_token)
 ):
-    scraped_data = await scrape_faculty_data(linkedin_url, scholar_url)
+    from scraper import ScrapeBlocked, scrape_faculty_data
+    try:
+        scraped_data = await scrape_faculty_data(linkedin_url, scholar_url)
+    except ScrapeBlocked as e:
+        raise HTTPException(status_code=503, detail=f"{e}; try again later")
     return scraped_data
 
 @app.post("/api/admin/faculty", response_model=FacultyResponse)
-async def create_new_faculty(faculty: FacultyUpdate, admin=Depends(verify_token)):
-    faculty_data = {
-        "name": faculty.name,
-        "designation": faculty.designation,
-        "department": faculty.department,
-        "office_location": faculty.office_location,
-        "email": faculty.email,
-        "google_scholar_url": faculty.google_scholar_url,
-        "linkedin_url": faculty.linkedin_url,
-        "profile_picture_url": faculty.profile_picture_url,
-        "headline": faculty.headline,
-        "experience": [exp.dict() for exp in faculty.experience] if faculty.experience else [],
-        "certifications": [cert.dict() for cert in faculty.certifications] if faculty.certifications else [],
-        "projects": [proj.dict() for proj in faculty.projects] if faculty.projects else [],
-        "publications": [pub.dict() for pub in faculty.publications] if faculty.publications else [],
-        "last_updated": datetime.now().isoformat()
-    }
-    
-    faculty_id = create_faculty(faculty_data)
-    created_faculty = get_faculty(faculty_id)
+async def create_new_faculty(
+    faculty: FacultyUpdate,
+    background_tasks: BackgroundTasks,
+    admin=Depends(verify_token)
+):
+    try:
+        faculty_id = await create_faculty(faculty_update_to_data(faculty))
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="A faculty member with this email already exists")
+    # The picture is downloaded after the response; photo_url appears once
+    # the thumbnails exist.
+    background_tasks.add_task(sync_photos, [faculty_id])
+    created_faculty = await get_faculty(faculty_id)
     return format_faculty_response(created_faculty)
 
+@app.post("/api/admin/faculty/bulk", response_model=BulkImportReport)
+async def bulk_import_faculty(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    admin=Depends(verify_token)
+):
+    fmt = detect_format(file.filename, file.content_type)
+    try:
+        with span("parse"):
+            parsed = await run_in_threadpool(lambda: list(read_faculty_rows(file.file, fmt)))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read upload: {e}")
+    
+    valid = [(line, faculty) for line, faculty, errors in parsed if faculty is not None]
+    results = await upsert_faculty_many([faculty_fields_to_data(f) for _, f in valid])
+    outcomes = {line: (faculty.name, result) for (line, faculty), result in zip(valid, results)}
+    background_tasks.add_task(sync_photos, {faculty_id for faculty_id, _ in results})
+    
+    report = {"created": 0, "updated": 0, "failed": 0, "rows": []}
+    for line, faculty, errors in parsed:
+        if errors:
+            report["failed"] += 1
+            report["rows"].append({"line": line, "status": "error", "errors": errors})
+            continue
+        name, (faculty_id, created) = outcomes[line]
+        status = "created" if created else "updated"
+        report[status] += 1
+        report["rows"].append({"line": line, "status": status, "id": faculty_id, "name": name})
+    return report
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@app.get("/api/admin/faculty/export")
+async def export_faculty(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    admin=Depends(verify_token)
+):
+    # Streamed a batch at a time in the layout the bulk import accepts.
+    async def body():
+        if fmt == "csv":
+            yield csv_lines([], header=True)
+        async for batch in iter_faculty_batches():
+            yield csv_lines(batch) if fmt == "csv" else ndjson_lines(batch)
+    
+    filename = f"faculty-{datetime.now():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.put("/api/admin/faculty/{faculty_id}", response_model=FacultyResponse)
 async def update_existing_faculty(
     faculty_id: int,
     faculty: FacultyUpdate,
+    background_tasks: BackgroundTasks,
     admin=Depends(verify_token)
 ):
-    existing = get_faculty(faculty_id)
-    if not existing:
+    try:
+        updated_faculty = await patch_faculty(faculty_id, faculty_update_to_data(faculty))
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="A faculty member with this email already exists")
+    if not updated_faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
-    
-    faculty_data = {
-        "name": faculty.name,
-        "designation": faculty.designation,
-        "department": faculty.department,
-        "office_location": faculty.office_location,
-        "email": faculty.email,
-        "google_scholar_url": faculty.google_scholar_url,
-        "linkedin_url": faculty.linkedin_url,
-        "profile_picture_url": faculty.profile_picture_url,
-        "headline": faculty.headline,
-        "experience": [exp.dict() for exp in faculty.experience] if faculty.experience else [],
-        "certifications": [cert.dict() for cert in faculty.certifications] if faculty.certifications else [],
-        "projects": [proj.dict() for proj in faculty.projects] if faculty.projects else [],
-        "publications": [pub.dict() for pub in faculty.publications] if faculty.publications else [],
-        "last_updated": datetime.now().isoformat()
-    }
-    
-    update_faculty(faculty_id, faculty_data)
-    updated_faculty = get_faculty(faculty_id)
+    background_tasks.add_task(sync_photos, [faculty_id])
+    return format_faculty_response(updated_faculty)
+
+@app.patch("/api/admin/faculty/{faculty_id}", response_model=FacultyResponse)
+async def patch_existing_faculty(
+    faculty_id: int,
+    faculty: FacultyPatch,
+    background_tasks: BackgroundTasks,
+    admin=Depends(verify_token)
+):
+    # Writes only the fields sent. Send the version from the profile being
+    # edited to get a 409 instead of overwriting someone else's changes.
+    if not faculty.model_fields_set - {"version"}:
+        # Nothing to write; a write would still bump the version under
+        # everyone else editing the profile.
+        current = await get_faculty(faculty_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Faculty not found")
+        if faculty.version is not None and faculty.version != current["version"]:
+            raise version_conflict(faculty.version, current["version"])
+        return format_faculty_response(current)
+
+    data = faculty_fields_to_data(faculty)
+    try:
+        updated_faculty = await patch_faculty(faculty_id, data)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="A faculty member with this email already exists")
+    except VersionConflict as e:
+        raise version_conflict(data["version"], e.version)
+    if not updated_faculty:
+        raise HTTPException(status_code=404, detail="Faculty not found")
+    if "profile_picture_url" in data:
+        background_tasks.add_task(sync_photos, [faculty_id])
     return format_faculty_response(updated_faculty)
 
 @app.delete("/api/admin/faculty/{faculty_id}")
 async def delete_existing_faculty(faculty_id: int, admin=Depends(verify_token)):
-    success = delete_faculty(faculty_id)
+    success = await delete_faculty(faculty_id)
     if not success:
         raise HTTPException(status_code=404, detail="Faculty not found")
     return {"message": "Faculty deleted successfully"}
 
-@app.get("/api/faculty", response_model=List[FacultyResponse])
-async def list_faculty():
-    faculty_list = get_all_faculty()
-    return [format_faculty_response(f) for f in faculty_list]
+@app.post("/api/admin/refresh-runs", response_model=RefreshRunReport, status_code=202)
+async def start_fleet_refresh(
+    department: Optional[str] = None,
+    restart: bool = False,
+    admin=Depends(verify_token)
+):
+    if active_run() is not None:
+        raise HTTPException(status_code=409, detail="A refresh run is already in progress")
+    try:
+        return await start_background_run(department, resume=not restart)
+    except RunInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/api/admin/refresh-runs/{run_id}", response_model=RefreshRunReport)
+async def get_fleet_refresh(run_id: int, admin=Depends(verify_token)):
+    run = await get_refresh_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Refresh run not found")
+    return run_report(run)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    # Gauges that are cheap to read on demand are sampled here rather than
+    # kept up to date on every change.
+    metrics.refresh_queue_depth.set(await refresh_scheduler.queue_depth())
+    metrics.read_model_documents.set(len(read_model))
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/admin/profiles", response_model=List[RequestProfile])
+async def list_request_profiles(admin=Depends(verify_token)):
+    return [dict(profile, functions=[]) for profile in await get_request_profiles()]
+
+@app.get("/api/admin/profiles/{profile_id}", response_model=RequestProfile)
+async def get_request_profile_by_id(profile_id: str, admin=Depends(verify_token)):
+    profile = await get_request_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+# The public read endpoints return pre-rendered documents from the read
+# model as raw bytes; response_model only documents their shape.
+@app.get("/api/faculty", response_model=Union[List[FacultyResponse], FacultyResults])
+async def list_faculty(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    filters: FacultyFilter = Depends(faculty_filter),
+    facets: bool = False
+):
+    await read_model.sync()
+    etag = etag_for(read_model.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    headers = {}
+    order = await read_model.filter(filters) if filters != NO_FILTER else None
+    
+    if limit is None and cursor is None:
+        faculty_list = read_model.page(order=order)
+    else:
+        page_size = limit or DEFAULT_PAGE_SIZE
+        after = decode_cursor(cursor) if cursor else None
+        faculty_list = read_model.page(page_size + 1, after, order)
+        if len(faculty_list) > page_size:
+            faculty_list = faculty_list[:page_size]
+            headers["X-Next-Cursor"] = encode_cursor(faculty_list[-1].name, faculty_list[-1].id)
+    facet_counts = await read_model.facets(filters) if facets else None
+    
+    with span("serialize"):
+        if view == "summary":
+            documents = [f.summary for f in faculty_list]
+        else:
+            documents = [f.document for f in faculty_list]
+        if facet_counts is not None:
+            content = with_facets(documents, facet_counts)
+        else:
+            content = json_array(documents)
+    return json_bytes_response(content, etag, headers)
+
+@app.get("/api/faculty/changes", response_model=FacultyChanges)
+async def list_faculty_changes(since: Optional[str] = None):
+    # Profiles written and ids deleted after `since`, a cursor returned by an
+    # earlier call. Without one, or with one from another database, every
+    # profile is returned with reset set, and the client replaces its copy.
+    await read_model.sync()
+    after, reset = 0, True
+    if since is not None:
+        instance_id, seq = parse_change_cursor(since)
+        if instance_id == read_model.instance_id:
+            after, reset = seq, False
+    
+    if not reset and after >= read_model.version:
+        # Nothing newer has reached this process yet; skip the database.
+        seq, documents, deleted = after, [], []
+    else:
+        seq, documents, deleted = await get_faculty_delta(after)
+    
+    with span("serialize"):
+        content = b"".join((
+            b'{"cursor":', json.dumps(f"{read_model.instance_id}-{seq}").encode(),
+            b',"reset":', b"true" if reset else b"false",
+            b',"updated":', json_array(documents),
+            b',"deleted":', json.dumps(deleted).encode(), b"}"
+        ))
+    return Response(content=content, media_type="application/json", headers={"Cache-Control": "no-cache"})
 
 @app.get("/api/faculty/{faculty_id}", response_model=FacultyResponse)
-async def get_faculty_by_id(faculty_id: int, background_tasks: BackgroundTasks):
-    faculty = get_faculty(faculty_id)
+async def get_faculty_by_id(faculty_id: int, request: Request):
+    await read_model.sync()
+    etag = etag_for(read_model.version)
+    faculty = read_model.get(faculty_id)
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     
-    if faculty["last_updated"]:
+    refreshed_at = max(filter(None, (faculty.last_updated, faculty.last_checked)), default=None)
+    if refreshed_at:
         try:
-            last_updated = datetime.fromisoformat(faculty["last_updated"])
-            if datetime.now() - last_updated > timedelta(hours=24):
-                background_tasks.add_task(
-                    background_scrape_and_update,
-                    faculty_id,
-                    faculty["linkedin_url"],
-                    faculty["google_scholar_url"]
-                )
-        except:
+            refreshed_at = datetime.fromisoformat(refreshed_at)
+            if datetime.now() - refreshed_at > timedelta(hours=24):
+                await refresh_scheduler.enqueue(faculty_id)
+        except ValueError:
             pass
     
-    return format_faculty_response(faculty)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    return json_bytes_response(faculty.document, etag)
+
+@app.get("/api/faculty/{faculty_id}/photo")
+async def get_faculty_photo(
+    faculty_id: int,
+    request: Request,
+    size: int = THUMBNAIL_SIZES[-1],
+    v: Optional[str] = None
+):
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"size must be one of {', '.join(map(str, THUMBNAIL_SIZES))}")
+    await read_model.sync()
+    faculty = read_model.get(faculty_id)
+    if not faculty or not faculty.photo_hash:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    
+    version = faculty.photo_hash[:16]
+    etag = f'"{version}-{size}"'
+    # photo_url carries the current version, and a URL with it never
+    # changes content; anything else must revalidate.
+    if v == version:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "no-cache"
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    
+    path = photo_path(faculty.photo_hash, size)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return FileResponse(path, media_type="image/webp", headers={"ETag": etag, "Cache-Control": cache_control})
 
-@app.get("/api/search", response_model=List[FacultyResponse])
-async def search_faculty_endpoint(q: str):
-    results = search_faculty(q)
-    return [format_faculty_response(f) for f in results]
+@app.get("/api/search", response_model=Union[List[FacultyResponse], FacultyResults])
+async def search_faculty_endpoint(
+    q: str,
+    request: Request,
+    filters: FacultyFilter = Depends(faculty_filter),
+    facets: bool = False
+):
+    await read_model.sync()
+    etag = etag_for(read_model.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    results = await read_model.search(q, filters)
+    facet_counts = await read_model.facets(filters, q) if facets else None
+    with span("serialize"):
+        documents = [f.document for f in results]
+        if facet_counts is not None:
+            content = with_facets(documents, facet_counts)
+        else:
+            content = json_array(documents)
+    return json_bytes_response(content, etag)
+
+@app.get("/api/suggest", response_model=List[Suggestion])
+async def suggest_endpoint(
+    q: str,
+    request: Request,
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS)
+):
+    # Answered from the read model's in-memory prefix index; kind is name,
+    # department, designation, project or publication, and faculty_id is set
+    # for names.
+    await read_model.sync()
+    etag = etag_for(read_model.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    suggestions = read_model.suggestions.suggest(q, limit)
+    return json_bytes_response(json.dumps(suggestions).encode(), etag)
 
 if __name__ == "__main__":
+    import tempfile
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # WEB_CONCURRENCY > 1 serves from that many worker processes sharing the
+    # database; their metrics are combined through METRICS_DIR.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1 and not os.getenv("METRICS_DIR"):
+        os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="faculty-hub-metrics-")
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers
+    )
@@ -0,0 +1,268 @@
+import asyncio
+import bisect
+import functools
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus instruments. Each one is a dict keyed by label values,
+# updated from the event loop without locks; rendering happens only when
+# /metrics is scraped.
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# With several server workers, each process writes its counters and
+# histograms to a file here every METRICS_FLUSH_INTERVAL seconds, and
+# /metrics adds up all the files. Gauges are sampled by whichever process
+# answers.
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+_export_name = f"{os.getpid()}-{uuid.uuid4().hex[:6]}.json"
+_exporter: Optional[asyncio.Task] = None
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["Metric"] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _labels(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self, values: dict) -> List[str]:
+        raise NotImplementedError
+
+    def export(self) -> list:
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+    def merged(self, exports: List[list]) -> dict:
+        return dict(self._values)
+
+    def render(self, exports: List[list] = ()) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples(self.merged(exports)))
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def merged(self, exports: List[list]) -> dict:
+        values = dict(self._values)
+        for labels, value in (item for export in exports for item in export):
+            values[tuple(labels)] = values.get(tuple(labels), 0.0) + value
+        return values
+
+    def samples(self, values: dict) -> List[str]:
+        return [f"{self.name}{self._labels(labels)} {_format_value(v)}" for labels, v in values.items()]
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def export(self) -> list:
+        return []
+
+    def samples(self, values: dict) -> List[str]:
+        return [f"{self.name}{self._labels(labels)} {_format_value(v)}" for labels, v in values.items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last), sum].
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def merged(self, exports: List[list]) -> dict:
+        values = {labels: [list(counts), total] for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in (item for export in exports for item in export):
+            state = values.setdefault(tuple(labels), [[0] * len(counts), 0.0])
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+        return values
+
+    def samples(self, values: dict) -> List[str]:
+        lines = []
+        for labels, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = self._labels(labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+def _read_exports() -> Dict[str, List[list]]:
+    exports: Dict[str, List[list]] = {}
+    for name in os.listdir(METRICS_DIR):
+        if name == _export_name or not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for metric, export in data.items():
+            exports.setdefault(metric, []).append(export)
+    return exports
+
+def render() -> str:
+    exports = _read_exports() if METRICS_DIR else {}
+    return "".join(metric.render(exports.get(metric.name, [])) for metric in _registry)
+
+def write_export():
+    # Atomic, so a concurrent render never reads half a file.
+    data = json.dumps({metric.name: metric.export() for metric in _registry}).encode()
+    fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(METRICS_DIR, _export_name))
+
+async def _export_periodically():
+    # Counters of a worker that exits stay in its last file, so totals
+    # never go backwards while the server runs.
+    try:
+        while True:
+            await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+            write_export()
+    finally:
+        write_export()
+
+def start_exporter():
+    global _exporter
+    if METRICS_DIR:
+        _exporter = asyncio.create_task(_export_periodically())
+
+async def stop_exporter():
+    global _exporter
+    if _exporter is not None:
+        _exporter.cancel()
+        await asyncio.gather(_exporter, return_exceptions=True)
+        _exporter = None
+
+def timed(histogram: Histogram) -> Callable:
+    # Records each call of an async function under its own name.
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, fn.__name__)
+        return wrapper
+    return decorator
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route")
+)
+http_requests = Counter(
+    "http_requests_total", "HTTP responses by route and status code.", ("method", "route", "status")
+)
+db_call_duration = Histogram(
+    "db_call_duration_seconds", "Time spent in database.py functions, including pool waits.", ("function",)
+)
+scraper_fetch_duration = Histogram(
+    "scraper_fetch_duration_seconds", "Time to fetch a page, per host.", ("host",)
+)
+scraper_fetches = Counter(
+    "scraper_fetches_total", "Page fetches by host and HTTP status (or 'error').", ("host", "status")
+)
+scraper_parse_duration = Histogram(
+    "scraper_parse_duration_seconds", "Time to parse a page, including waiting for a parse slot.", ("parser",)
+)
+scraper_scrapes = Counter(
+    "scraper_scrapes_total", "Source scrapes by outcome: updated, unchanged, failed or blocked.", ("source", "outcome")
+)
+page_cache_requests = Counter(
+    "page_cache_requests_total", "Conditional fetches answered from the page cache (hit) or downloaded (miss).", ("result",)
+)
+search_cache_requests = Counter(
+    "search_cache_requests_total", "Search queries answered from the read model's cache.", ("result",)
+)
+refresh_jobs = Counter(
+    "refresh_jobs_total", "Background refresh jobs by outcome.", ("outcome",)
+)
+refresh_queue_depth = Gauge(
+    "refresh_queue_depth", "Profiles waiting in the refresh queue."
+)
+read_model_documents = Gauge(
+    "read_model_documents", "Faculty documents held in the in-memory read model."
+)
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware, which would add a task and
+    # a stream wrapper to every request.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; labelling by
+            # its template keeps ids out of the label values.
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], path)
+            http_requests.inc(scope["method"], path, status)
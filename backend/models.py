@@ -20,6 +20,7 @@ class Publication(BaseModel):
     authors: Optional[str] = None
     year: Optional[str] = None
     citation: Optional[str] = None
+    cited_by: Optional[int] = None
 
 class FacultyBase(BaseModel):
     name: str
@@ -44,12 +45,119 @@ class FacultyUpdate(FacultyBase):
 class FacultyResponse(FacultyBase):
     id: int
     profile_picture_url: Optional[str] = None
+    # Locally cached thumbnails; append &size=96 or &size=256.
+    photo_url: Optional[str] = None
     headline: Optional[str] = None
     experience: Optional[List[ExperienceItem]] = []
     certifications: Optional[List[Certification]] = []
     projects: Optional[List[Project]] = []
     publications: Optional[List[Publication]] = []
     last_updated: Optional[str] = None
+    # Send back in a PATCH to make it conditional.
+    version: Optional[int] = None
+
+class FacultyChanges(BaseModel):
+    cursor: str
+    reset: bool
+    updated: List[FacultyResponse]
+    deleted: List[int]
+
+class FacultyPatch(BaseModel):
+    # Only the fields sent are written. With version, the patch only applies
+    # if the profile is still at that version.
+    name: Optional[str] = None
+    designation: Optional[str] = None
+    department: Optional[str] = None
+    office_location: Optional[str] = None
+    email: Optional[EmailStr] = None
+    google_scholar_url: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    profile_picture_url: Optional[str] = None
+    headline: Optional[str] = None
+    experience: Optional[List[ExperienceItem]] = None
+    certifications: Optional[List[Certification]] = None
+    projects: Optional[List[Project]] = None
+    publications: Optional[List[Publication]] = None
+    version: Optional[int] = None
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class FacultyFacets(BaseModel):
+    department: List[FacetCount]
+    designation: List[FacetCount]
+
+class FacultyResults(BaseModel):
+    faculty: List[FacultyResponse]
+    total: int
+    facets: FacultyFacets
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str
+    faculty_id: Optional[int] = None
+    count: int
+
+class BulkImportRowResult(BaseModel):
+    line: int
+    status: str
+    id: Optional[int] = None
+    name: Optional[str] = None
+    errors: List[str] = []
+
+class BulkImportReport(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    rows: List[BulkImportRowResult]
+
+class RefreshRunFailure(BaseModel):
+    faculty_id: int
+    name: str
+    error: str
+
+class RefreshRunReport(BaseModel):
+    id: int
+    department: Optional[str] = None
+    status: str
+    started_at: str
+    finished_at: Optional[str] = None
+    last_faculty_id: int
+    total: int
+    processed: int
+    updated: int
+    unchanged: int
+    failed: int
+    elapsed_seconds: float
+    profiles_per_minute: float
+    failures: List[RefreshRunFailure] = []
+
+class ProfileSpans(BaseModel):
+    db: float
+    render: float
+    parse: float
+    serialize: float
+    other: float
+
+class ProfiledFunction(BaseModel):
+    function: str
+    calls: int
+    total_ms: float
+    cumulative_ms: float
+
+class RequestProfile(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    status: int
+    started_at: str
+    duration_ms: float
+    spans: ProfileSpans
+    # Other requests in flight in the same process while this one ran.
+    overlapped: int = 0
+    functions: List[ProfiledFunction] = []
 
 class AdminLogin(BaseModel):
     password: str
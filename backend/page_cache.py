@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+PAGE_CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", "page_cache")
+
+# Fetched pages are stored once under the sha256 of their body
+# (objects/ab/abcd...), and each URL has a small entry recording the hash it
+# last resolved to plus the validators to send on the next request.
+# refs/ab/abcd.../ holds one empty file per URL pointing at an object, so a
+# superseded object is deleted as soon as its last URL moves on.
+
+_lock = threading.Lock()
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _object_path(content_hash: str) -> str:
+    return os.path.join(PAGE_CACHE_DIR, "objects", content_hash[:2], content_hash)
+
+def _refs_path(content_hash: str) -> str:
+    return os.path.join(PAGE_CACHE_DIR, "refs", content_hash[:2], content_hash)
+
+def _entry_path(url: str) -> str:
+    return os.path.join(PAGE_CACHE_DIR, "urls", _sha256(url.encode()) + ".json")
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_entry(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_entry_path(url), "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_object(content_hash: str) -> Optional[bytes]:
+    try:
+        with open(_object_path(content_hash), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _release(content_hash: str, url_key: str):
+    refs = _refs_path(content_hash)
+    try:
+        os.unlink(os.path.join(refs, url_key))
+        os.rmdir(refs)
+    except OSError:
+        # Still referenced by another URL (or already gone).
+        return
+    try:
+        os.unlink(_object_path(content_hash))
+    except OSError:
+        pass
+
+def store(url: str, content: bytes, etag: Optional[str], last_modified: Optional[str]) -> str:
+    content_hash = _sha256(content)
+    url_key = _sha256(url.encode())
+    previous = load_entry(url)
+    entry = {
+        "url": url,
+        "content_hash": content_hash,
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+    # Another process can still race this; the scraper refetches a page
+    # whose object has gone missing.
+    with _lock:
+        if not os.path.exists(_object_path(content_hash)):
+            write_atomic(_object_path(content_hash), content)
+        os.makedirs(_refs_path(content_hash), exist_ok=True)
+        open(os.path.join(_refs_path(content_hash), url_key), "wb").close()
+        write_atomic(_entry_path(url), json.dumps(entry).encode())
+        if previous and previous.get("content_hash") not in (None, content_hash):
+            _release(previous["content_hash"], url_key)
+    return content_hash
@@ -0,0 +1,162 @@
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from lxml import etree, html
+
+logger = logging.getLogger(__name__)
+
+# "lxml" (default) or "legacy" to force the original BeautifulSoup rules.
+SCRAPER_PARSER = os.getenv("SCRAPER_PARSER", "lxml")
+
+def empty_linkedin_data() -> Dict[str, Any]:
+    return {
+        'profile_picture_url': None,
+        'headline': None,
+        'experience': [],
+        'certifications': [],
+        'projects': []
+    }
+
+def cited_by(text: str) -> Optional[int]:
+    # Scholar leaves the cell empty for uncited papers.
+    return int(text) if text.isdigit() else None
+
+# Original rules: BeautifulSoup with html.parser and lambda class matchers.
+# Kept as the fallback for pages the lxml path can't handle.
+
+def parse_linkedin_legacy(content: bytes) -> Dict[str, Any]:
+    soup = BeautifulSoup(content, 'html.parser')
+    data = empty_linkedin_data()
+
+    try:
+        img_tag = soup.find('img', class_=lambda x: x and 'profile' in x.lower() if x else False)
+        if not img_tag:
+            img_tag = soup.find('img', attrs={'alt': True})
+        if img_tag and img_tag.get('src'):
+            data['profile_picture_url'] = img_tag['src']
+    except Exception as e:
+        logger.warning(f"Could not extract profile picture: {e}")
+
+    try:
+        headline_elem = soup.find('div', class_=lambda x: x and 'headline' in x.lower() if x else False)
+        if not headline_elem:
+            headline_elem = soup.find('h2', class_=lambda x: x and 'top-card' in x.lower() if x else False)
+        if headline_elem:
+            data['headline'] = headline_elem.get_text(strip=True)
+    except Exception as e:
+        logger.warning(f"Could not extract headline: {e}")
+
+    return data
+
+def parse_google_scholar_legacy(content: bytes) -> List[Dict[str, Any]]:
+    soup = BeautifulSoup(content, 'html.parser')
+    publications = []
+
+    try:
+        for row in soup.find_all('tr', class_='gsc_a_tr'):
+            title_elem = row.find('a', class_='gsc_a_at')
+            # The first gray line lists the authors, the second the venue.
+            gray_elems = row.find_all('div', class_='gs_gray')
+            year_elem = row.find('span', class_='gsc_a_h')
+            cited_elem = row.find('a', class_='gsc_a_ac')
+
+            if title_elem:
+                publications.append({
+                    'title': title_elem.get_text(strip=True),
+                    'authors': gray_elems[0].get_text(strip=True) if gray_elems else None,
+                    'year': year_elem.get_text(strip=True) if year_elem else None,
+                    'citation': gray_elems[1].get_text(strip=True) or None if len(gray_elems) > 1 else None,
+                    'cited_by': cited_by(cited_elem.get_text(strip=True)) if cited_elem else None
+                })
+    except Exception as e:
+        logger.warning(f"Could not extract publications: {e}")
+
+    return publications
+
+# The same rules as compiled XPath over an lxml tree. libxml2 builds the tree
+# in C and the selectors run there too, instead of a Python callback per tag.
+
+def _lower(expr: str) -> str:
+    return f"translate({expr}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_PROFILE_IMG = etree.XPath(f"(//img[contains({_lower('@class')}, 'profile')])[1]")
+_ALT_IMG = etree.XPath("(//img[@alt])[1]")
+_HEADLINE_DIV = etree.XPath(f"(//div[contains({_lower('@class')}, 'headline')])[1]")
+_TOP_CARD_H2 = etree.XPath(f"(//h2[contains({_lower('@class')}, 'top-card')])[1]")
+_SCHOLAR_ROWS = etree.XPath(f"//tr[{_has_class('gsc_a_tr')}]")
+_SCHOLAR_TITLE = etree.XPath(f"(.//a[{_has_class('gsc_a_at')}])[1]")
+_SCHOLAR_GRAY = etree.XPath(f".//div[{_has_class('gs_gray')}]")
+_SCHOLAR_YEAR = etree.XPath(f"(.//span[{_has_class('gsc_a_h')}])[1]")
+_SCHOLAR_CITED_BY = etree.XPath(f"(.//a[{_has_class('gsc_a_ac')}])[1]")
+_TEXT = etree.XPath(".//text()")
+
+def _first(xpath: etree.XPath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+def _text(node) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True).
+    return "".join(text.strip() for text in _TEXT(node))
+
+def parse_linkedin_lxml(content: bytes) -> Dict[str, Any]:
+    data = empty_linkedin_data()
+    if not content.strip():
+        return data
+    root = html.document_fromstring(content)
+
+    img = _first(_PROFILE_IMG, root)
+    if img is None:
+        img = _first(_ALT_IMG, root)
+    if img is not None and img.get('src'):
+        data['profile_picture_url'] = img.get('src')
+
+    headline = _first(_HEADLINE_DIV, root)
+    if headline is None:
+        headline = _first(_TOP_CARD_H2, root)
+    if headline is not None:
+        data['headline'] = _text(headline)
+
+    return data
+
+def parse_google_scholar_lxml(content: bytes) -> List[Dict[str, Any]]:
+    publications = []
+    if not content.strip():
+        return publications
+    root = html.document_fromstring(content)
+
+    for row in _SCHOLAR_ROWS(root):
+        title = _first(_SCHOLAR_TITLE, row)
+        if title is None:
+            continue
+        gray = _SCHOLAR_GRAY(row)
+        year = _first(_SCHOLAR_YEAR, row)
+        cited = _first(_SCHOLAR_CITED_BY, row)
+        publications.append({
+            'title': _text(title),
+            'authors': _text(gray[0]) if gray else None,
+            'year': _text(year) if year is not None else None,
+            'citation': _text(gray[1]) or None if len(gray) > 1 else None,
+            'cited_by': cited_by(_text(cited)) if cited is not None else None
+        })
+
+    return publications
+
+def _parse(fast: Callable[[bytes], Any], legacy: Callable[[bytes], Any], content: bytes):
+    if SCRAPER_PARSER == "legacy":
+        return legacy(content)
+    try:
+        return fast(content)
+    except Exception as e:
+        logger.warning(f"lxml parsing failed, using the legacy parser: {e}")
+        return legacy(content)
+
+def parse_linkedin(content: bytes) -> Dict[str, Any]:
+    return _parse(parse_linkedin_lxml, parse_linkedin_legacy, content)
+
+def parse_google_scholar(content: bytes) -> List[Dict[str, Any]]:
+    return _parse(parse_google_scholar_lxml, parse_google_scholar_legacy, content)
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from database import get_pending_photos, save_photos
+from page_cache import write_atomic
+
+logger = logging.getLogger(__name__)
+
+PHOTO_CACHE_DIR = os.getenv("PHOTO_CACHE_DIR", "photo_cache")
+# Square WebP thumbnails generated for every picture, in pixels.
+THUMBNAIL_SIZES = (96, 256)
+THUMBNAIL_QUALITY = 80
+# Larger downloads are not decoded.
+MAX_PHOTO_BYTES = 5 * 1024 * 1024
+# Profiles whose photos are downloaded before their rows are written.
+PHOTO_BATCH_SIZE = 50
+
+# Thumbnails are stored under the sha256 of the original download
+# (ab/abcd...-96.webp), so a picture served from a new signed URL but with
+# the same bytes is neither decoded nor stored twice.
+
+# Held while a batch is downloaded and saved, so thumbnails that just became
+# unused are not deleted under a download that is about to reuse them.
+_photo_lock = asyncio.Lock()
+
+def photo_path(photo_hash: str, size: int) -> str:
+    return os.path.join(PHOTO_CACHE_DIR, photo_hash[:2], f"{photo_hash}-{size}.webp")
+
+def make_thumbnails(content: bytes) -> Dict[int, bytes]:
+    # Pillow is only needed by processes that download pictures.
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(content)) as image:
+        # Lets the JPEG decoder scale down while decoding, which is most of
+        # the cost for large pictures.
+        image.draft("RGB", (max(THUMBNAIL_SIZES), max(THUMBNAIL_SIZES)))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        thumbnails = {}
+        for size in THUMBNAIL_SIZES:
+            buffer = io.BytesIO()
+            ImageOps.fit(image, (size, size), Image.LANCZOS).save(buffer, "WEBP", quality=THUMBNAIL_QUALITY)
+            thumbnails[size] = buffer.getvalue()
+    return thumbnails
+
+def store_thumbnails(content: bytes) -> str:
+    photo_hash = hashlib.sha256(content).hexdigest()
+    if not all(os.path.exists(photo_path(photo_hash, size)) for size in THUMBNAIL_SIZES):
+        for size, thumbnail in make_thumbnails(content).items():
+            write_atomic(photo_path(photo_hash, size), thumbnail)
+    return photo_hash
+
+def delete_thumbnails(photo_hash: str):
+    for size in THUMBNAIL_SIZES:
+        try:
+            os.unlink(photo_path(photo_hash, size))
+        except FileNotFoundError:
+            pass
+
+async def cache_photo(url: str) -> str:
+    # Downloads through the scraper's client, so the per-host connection
+    # limits and fetch metrics apply. Returns the photo hash.
+    from scraper import fetch
+
+    response = await fetch(url)
+    if len(response.content) > MAX_PHOTO_BYTES:
+        raise ValueError(f"picture is larger than {MAX_PHOTO_BYTES} bytes")
+    return await asyncio.to_thread(store_thumbnails, response.content)
+
+async def _photo_for(faculty_id: int, url: Optional[str]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    if url is None:
+        return None, None
+    try:
+        return await cache_photo(url), url
+    except Exception as e:
+        # The previous thumbnails, if any, keep being served.
+        logger.warning(f"Could not cache the picture of faculty {faculty_id} from {url}: {e}")
+        return None
+
+async def sync_photos(faculty_ids: Iterable[int]):
+    # Brings the cached photos of these profiles in line with their
+    # profile_picture_url; profiles already up to date cost one query.
+    pending = list((await get_pending_photos(faculty_ids)).items())
+    for start in range(0, len(pending), PHOTO_BATCH_SIZE):
+        batch = pending[start:start + PHOTO_BATCH_SIZE]
+        async with _photo_lock:
+            results = await asyncio.gather(*(_photo_for(faculty_id, url) for faculty_id, url in batch))
+            photos = {faculty_id: result for (faculty_id, _), result in zip(batch, results) if result is not None}
+            if not photos:
+                continue
+            for photo_hash in await save_photos(photos):
+                await asyncio.to_thread(delete_thumbnails, photo_hash)
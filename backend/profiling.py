@@ -0,0 +1,161 @@
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Requests carrying this header with a valid admin token are profiled.
+PROFILE_HEADER = b"x-profile-token"
+# Profiles kept; older ones are dropped.
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "50"))
+PROFILE_TOP_FUNCTIONS = 40
+
+PHASES = ("db", "render", "parse", "serialize")
+
+class _Span:
+    __slots__ = ("profile", "child_time")
+
+    def __init__(self, profile: Dict[str, Any]):
+        self.profile = profile
+        self.child_time = 0.0
+
+# The span currently open in this task; None outside profiled requests, so
+# span() costs one ContextVar lookup for everyone else.
+_current: contextvars.ContextVar[Optional[_Span]] = contextvars.ContextVar("profile_span", default=None)
+
+@contextmanager
+def _timed_span(parent: _Span, phase: str):
+    span = _Span(parent.profile)
+    token = _current.set(span)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current.reset(token)
+        # Time is charged to the innermost phase only, so nested spans
+        # (rendering inside a database transaction) aren't counted twice.
+        spans = span.profile["spans"]
+        spans[phase] = spans.get(phase, 0.0) + elapsed - span.child_time
+        parent.child_time += elapsed
+
+def span(phase: str):
+    parent = _current.get()
+    if parent is None:
+        return nullcontext()
+    return _timed_span(parent, phase)
+
+def _top_functions(profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows[:PROFILE_TOP_FUNCTIONS]
+    ]
+
+async def _send_error(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class ProfilingMiddleware:
+    # Pure ASGI: requests without the header go straight through after one
+    # scan of the header list. authorize(token) decides whether a token
+    # may request a profile; store(profile, keep) saves the result.
+    #
+    # The span breakdown follows the request's own task. cProfile hooks the
+    # whole interpreter instead, so its function list also covers whatever
+    # else ran meanwhile; `overlapped` counts the requests in flight during
+    # the profile, and only one request at a time gets a function list.
+    def __init__(
+        self,
+        app,
+        authorize: Callable[[str], bool],
+        store: Callable[[Dict[str, Any], int], Awaitable[None]]
+    ):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self._in_flight = 0
+        self._profiling: List[Dict[str, Any]] = []
+        self._profiler_busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if token is not None and not self.authorize(token.decode("latin-1")):
+            await _send_error(send, 401, "Invalid profiling token")
+            return
+
+        for profile in self._profiling:
+            profile["overlapped"] += 1
+        self._in_flight += 1
+        try:
+            if token is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _profile(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex[:12]
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "status": 500,
+            "started_at": datetime.now().isoformat(),
+            "spans": {},
+            # Requests already running; the ones started later add to it.
+            "overlapped": self._in_flight - 1,
+        }
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        root = _Span(profile)
+        token = _current.set(root)
+        # A second profiler would replace the first one's hook.
+        profiler = None if self._profiler_busy else cProfile.Profile()
+        self._profiling.append(profile)
+        start = time.perf_counter()
+        if profiler is not None:
+            self._profiler_busy = True
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profiler_busy = False
+            elapsed = time.perf_counter() - start
+            self._profiling.remove(profile)
+            _current.reset(token)
+
+            spans = profile["spans"]
+            profile["spans"] = {phase: round(spans.get(phase, 0.0) * 1000, 3) for phase in PHASES}
+            profile["spans"]["other"] = round((elapsed - root.child_time) * 1000, 3)
+            profile["duration_ms"] = round(elapsed * 1000, 3)
+            profile["functions"] = _top_functions(profiler) if profiler is not None else []
+            await self.store(profile, PROFILE_HISTORY)
@@ -0,0 +1,165 @@
+import asyncio
+import bisect
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, List, Dict, NamedTuple, Tuple
+
+from database import (
+    FACET_FIELDS, NO_FILTER, FacultyFilter, add_change_listener, build_search_query, filter_faculty_keys,
+    get_change_state, get_changes, get_documents, get_facet_counts, get_suggest_terms,
+    search_faculty_ids
+)
+from metrics import search_cache_requests
+from suggest import SuggestIndex
+
+SEARCH_CACHE_SIZE = 256
+# How stale a read may be after a write by another process (another server
+# worker or the fleet CLI), in seconds. Writes by this process are seen at
+# once.
+READ_MODEL_POLL_INTERVAL = float(os.getenv("READ_MODEL_POLL_INTERVAL", "1.0"))
+
+class FacultyDocument(NamedTuple):
+    id: int
+    name: str
+    last_updated: Optional[str]
+    last_checked: Optional[str]
+    linkedin_url: Optional[str]
+    google_scholar_url: Optional[str]
+    photo_hash: Optional[str]
+    document: bytes
+    summary: bytes
+
+# Pre-rendered faculty documents held in memory. `version` is the last seq
+# of the faculty_changes log applied, so every process serving the same data
+# advertises the same ETag. sync() polls the log at most every
+# READ_MODEL_POLL_INTERVAL (or right after a local write) and reloads only
+# the rows listed since. `version` only moves together with the data, so
+# callers read it after `sync()`.
+class FacultyReadModel:
+    def __init__(self):
+        # Set from the database on load; keeps ETags from another database
+        # (a restored backup, say) from matching.
+        self.instance_id = ""
+        self.version = 0
+        self._loaded = False
+        self._next_poll = 0.0
+        self._records: Dict[int, FacultyDocument] = {}
+        self._order: List[Tuple[str, int]] = []
+        # Search results, filtered listings and facet counts, until the next
+        # change.
+        self._searches: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.suggestions = SuggestIndex()
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, faculty_id: int):
+        # A write committed by this process: poll on the next read.
+        self._next_poll = 0.0
+
+    async def sync(self):
+        if self._loaded and time.monotonic() < self._next_poll:
+            return
+
+        async with self._lock:
+            if not self._loaded:
+                await self._load()
+            elif time.monotonic() >= self._next_poll:
+                self._next_poll = time.monotonic() + READ_MODEL_POLL_INTERVAL
+                oldest, changes = await get_changes(self.version)
+                if oldest is not None and oldest > self.version + 1:
+                    # Fell behind the pruned log; start over.
+                    await self._load()
+                elif changes:
+                    changed = {faculty_id for _, faculty_id in changes}
+                    rows = {row["id"]: row for row in await get_documents(changed)}
+                    for faculty_id in changed:
+                        self._remove(faculty_id)
+                        if faculty_id in rows:
+                            self._add(FacultyDocument(**rows[faculty_id]))
+                    self.suggestions.update(changed, await get_suggest_terms(changed))
+                    self.version = changes[-1][0]
+                    self._searches.clear()
+
+    async def _load(self):
+        self._next_poll = time.monotonic() + READ_MODEL_POLL_INTERVAL
+        instance_id, version = await get_change_state()
+        records = [FacultyDocument(**row) for row in await get_documents()]
+        self.suggestions.build(await get_suggest_terms())
+        self._records = {record.id: record for record in records}
+        self._order = [(record.name, record.id) for record in records]
+        self.instance_id, self.version = instance_id, version
+        self._searches.clear()
+        self._loaded = True
+
+    def _remove(self, faculty_id: int):
+        record = self._records.pop(faculty_id, None)
+        if record is not None:
+            key = (record.name, faculty_id)
+            index = bisect.bisect_left(self._order, key)
+            if index < len(self._order) and self._order[index] == key:
+                del self._order[index]
+
+    def _add(self, record: FacultyDocument):
+        self._records[record.id] = record
+        bisect.insort(self._order, (record.name, record.id))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, faculty_id: int) -> Optional[FacultyDocument]:
+        return self._records.get(faculty_id)
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, int]] = None,
+        order: Optional[List[Tuple[str, int]]] = None
+    ) -> List[FacultyDocument]:
+        # order is a (name, id) list from filter(); the whole directory
+        # otherwise.
+        order = self._order if order is None else order
+        start = bisect.bisect_right(order, after) if after is not None else 0
+        end = len(order) if limit is None else start + limit
+        return [self._records[faculty_id] for _, faculty_id in order[start:end] if faculty_id in self._records]
+
+    async def _cached(self, key: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        result = self._searches.get(key)
+        if result is None:
+            search_cache_requests.inc("miss")
+            version = self.version
+            result = await load()
+            # A write landed while we were querying; don't cache a stale result.
+            if version == self.version:
+                self._searches[key] = result
+                if len(self._searches) > SEARCH_CACHE_SIZE:
+                    self._searches.popitem(last=False)
+        else:
+            search_cache_requests.inc("hit")
+            self._searches.move_to_end(key)
+        return result
+
+    async def search(self, query: str, filters: FacultyFilter = NO_FILTER) -> List[FacultyDocument]:
+        match = build_search_query(query)
+        if match is None:
+            return []
+
+        faculty_ids = await self._cached(("search", match, filters), lambda: search_faculty_ids(match, filters))
+        await self.sync()
+        return [self._records[f] for f in faculty_ids if f in self._records]
+
+    async def filter(self, filters: FacultyFilter) -> List[Tuple[str, int]]:
+        # The (name, id) order of the matching profiles, for page().
+        order = await self._cached(("filter", filters), lambda: filter_faculty_keys(filters))
+        await self.sync()
+        return order
+
+    async def facets(self, filters: FacultyFilter, query: Optional[str] = None) -> Dict[str, Any]:
+        # {"total": ..., "facets": {"department": [...], "designation": [...]}}
+        # for the profiles a listing or search with these filters returns.
+        match = build_search_query(query) if query is not None else None
+        if query is not None and match is None:
+            return {"total": 0, "facets": {field: [] for field in FACET_FIELDS}}
+        return await self._cached(("facets", match, filters), lambda: get_facet_counts(filters, match))
+
+read_model = FacultyReadModel()
+add_change_listener(read_model.invalidate)
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from database import (
+    acquire_lease, claim_refresh_job, complete_refresh, count_refresh_queue,
+    enqueue_refresh, get_faculty, mark_faculty_checked, patch_faculty, release_lease,
+    reschedule_refresh, VersionConflict
+)
+from metrics import refresh_jobs
+from photos import sync_photos
+
+logger = logging.getLogger(__name__)
+
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "2"))
+# Minimum gap between two requests to the same host, in seconds.
+REFRESH_HOST_INTERVAL = float(os.getenv("REFRESH_HOST_INTERVAL", "2.0"))
+# Retry delay after a failed refresh; doubles per attempt up to the maximum.
+REFRESH_BACKOFF_BASE = float(os.getenv("REFRESH_BACKOFF_BASE", "60"))
+REFRESH_BACKOFF_MAX = float(os.getenv("REFRESH_BACKOFF_MAX", str(24 * 3600)))
+# How long a host is left alone after it answers 429/999; doubles per trip.
+BREAKER_COOLDOWN = float(os.getenv("REFRESH_BREAKER_COOLDOWN", "300"))
+BREAKER_COOLDOWN_MAX = float(os.getenv("REFRESH_BREAKER_COOLDOWN_MAX", "3600"))
+# A claimed job is handed to another worker if it runs longer than this.
+JOB_LEASE = 300.0
+POLL_INTERVAL = 5.0
+# Repeat enqueues of the same id within this window skip the database.
+ENQUEUE_DEDUPE_WINDOW = 60.0
+# With several server processes only the holder of this lease runs refresh
+# workers, so per-host rate limits and breakers stay in one place. The
+# holder renews it every POLL_INTERVAL; another process takes over once it
+# lapses.
+SCHEDULER_LEASE = "refresh-scheduler"
+SCHEDULER_LEASE_TTL = 3 * POLL_INTERVAL
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def backoff_delay(attempts: int, base: float, maximum: float) -> float:
+    return min(base * 2 ** max(attempts - 1, 0), maximum)
+
+class HostRateLimiter:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, host: str):
+        # Reserve the next free slot for this host before sleeping, so
+        # concurrent callers queue up behind each other instead of bursting.
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class CircuitBreaker:
+    def __init__(self, cooldown: float, cooldown_max: float):
+        self.cooldown = cooldown
+        self.cooldown_max = cooldown_max
+        self.trips = 0
+        self.open_until = 0.0
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def trip(self, now: float):
+        self.trips += 1
+        self.open_until = now + backoff_delay(self.trips, self.cooldown, self.cooldown_max)
+
+    def reset(self):
+        self.trips = 0
+        self.open_until = 0.0
+
+def host_of(url: Optional[str]) -> Optional[str]:
+    return urlparse(url).hostname if url else None
+
+class ScrapeFailed(Exception):
+    pass
+
+class HostUnavailable(Exception):
+    def __init__(self, open_until: float):
+        super().__init__("host circuit open")
+        self.open_until = open_until
+
+async def build_refresh(faculty: dict) -> dict:
+    # Imported here so server processes that never scrape don't load the
+    # HTTP client and parsers.
+    from scraper import scrape_faculty_data
+    # source_hashes records the page each source was last read from, so
+    # sources whose page hasn't changed since are left out of scraped_data
+    # and keep their stored values.
+    known_hashes = json.loads(faculty["source_hashes"] or "{}")
+    scraped_data = await scrape_faculty_data(
+        faculty["linkedin_url"], faculty["google_scholar_url"],
+        known_hashes=known_hashes, known_publications=faculty["publications"]
+    )
+    urls = [url for url in (faculty["linkedin_url"], faculty["google_scholar_url"]) if url]
+    if urls and len(scraped_data["failed_sources"]) == len(urls):
+        raise ScrapeFailed(f"Could not fetch {', '.join(urls)}")
+    source_hashes = {url: known_hashes[url] for url in urls if url in known_hashes}
+    source_hashes.update(scraped_data["page_hashes"])
+
+    update_data = {
+        "name": faculty["name"],
+        "designation": faculty["designation"],
+        "department": faculty["department"],
+        "office_location": faculty["office_location"],
+        "email": faculty["email"],
+        "google_scholar_url": faculty["google_scholar_url"],
+        "linkedin_url": faculty["linkedin_url"],
+        "profile_picture_url": scraped_data.get("profile_picture_url") or faculty["profile_picture_url"],
+        "headline": scraped_data.get("headline") or faculty["headline"],
+        # The LinkedIn parser doesn't extract these lists and returns them
+        # empty, as does a profile without a Scholar URL; the lists an admin
+        # entered are only replaced by what a scrape actually found.
+        "experience": scraped_data.get("experience") or faculty["experience"],
+        "certifications": scraped_data.get("certifications") or faculty["certifications"],
+        "projects": scraped_data.get("projects") or faculty["projects"],
+        "publications": scraped_data.get("publications") or faculty["publications"],
+        "last_updated": datetime.now().isoformat(),
+        "source_hashes": json.dumps(source_hashes, sort_keys=True)
+    }
+    return update_data
+
+def profile_changed(faculty: dict, update_data: dict) -> bool:
+    return any(
+        update_data[field] != faculty[field]
+        for field in update_data if field not in ("last_updated", "source_hashes")
+    )
+
+def refresh_changes(faculty: dict, update_data: dict) -> dict:
+    # A patch of the fields the scrape changed, only applied if the profile
+    # is still at the version it was scraped from, so an admin's edit made
+    # in the meantime isn't overwritten.
+    changes = {
+        field: value for field, value in update_data.items()
+        if field in ("last_updated", "source_hashes") or value != faculty[field]
+    }
+    return dict(changes, version=faculty["version"])
+
+async def save_refresh(faculty: dict, update_data: dict):
+    # Raises VersionConflict if the profile was edited since it was read.
+    if profile_changed(faculty, update_data):
+        await patch_faculty(faculty["id"], refresh_changes(faculty, update_data))
+    else:
+        # Nothing to rewrite; only record that the profile was checked.
+        await mark_faculty_checked(faculty["id"], update_data["last_updated"], update_data["source_hashes"])
+    await sync_photos([faculty["id"]])
+
+# Runs profile refreshes off the request path. Jobs live in the
+# refresh_queue table, one row per faculty member, so repeated requests for
+# the same stale profile collapse into a single scrape and pending work
+# survives restarts.
+class RefreshScheduler:
+    def __init__(self, workers: int = REFRESH_WORKERS):
+        self.workers = workers
+        self.limiter = HostRateLimiter(REFRESH_HOST_INTERVAL)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # When this process last enqueued each id; skips the insert when ten
+        # visitors open the same stale profile.
+        self._recent: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._leader: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(BREAKER_COOLDOWN, BREAKER_COOLDOWN_MAX)
+        return self.breakers[host]
+
+    async def enqueue(self, faculty_id: int):
+        now = time.time()
+        if now - self._recent.get(faculty_id, 0.0) < ENQUEUE_DEDUPE_WINDOW:
+            return
+        if len(self._recent) > 10000:
+            self._recent.clear()
+        self._recent[faculty_id] = now
+
+        try:
+            if await enqueue_refresh(faculty_id, now):
+                self._wakeup.set()
+        except Exception as e:
+            logger.error(f"Could not enqueue refresh for faculty {faculty_id}: {e}")
+
+    async def queue_depth(self) -> int:
+        return await count_refresh_queue()
+
+    async def scrape(self, faculty: dict) -> dict:
+        # build_refresh within the shared per-host limits. Raises
+        # HostUnavailable while a host is paused, and ScrapeBlocked (after
+        # pausing the host) when it refuses a request.
+        from scraper import ScrapeBlocked
+        hosts = [h for h in (host_of(faculty["linkedin_url"]), host_of(faculty["google_scholar_url"])) if h]
+        now = time.time()
+        open_until = max((self.breaker(h).open_until for h in hosts if self.breaker(h).is_open(now)), default=None)
+        if open_until is not None:
+            raise HostUnavailable(open_until)
+
+        for host in hosts:
+            await self.limiter.wait(host)
+
+        try:
+            update_data = await build_refresh(faculty)
+        except ScrapeBlocked as e:
+            breaker = self.breaker(e.host)
+            breaker.trip(time.time())
+            logger.warning(f"{e}; pausing refreshes for {e.host} until {datetime.fromtimestamp(breaker.open_until)}")
+            raise
+
+        for host in hosts:
+            self.breaker(host).reset()
+        return update_data
+
+    def start(self):
+        if self.workers > 0:
+            self._leader = asyncio.create_task(self._lead())
+
+    async def stop(self):
+        if self._leader is not None:
+            self._leader.cancel()
+            await asyncio.gather(self._leader, return_exceptions=True)
+            self._leader = None
+
+    async def _lead(self):
+        try:
+            while True:
+                try:
+                    leading = await acquire_lease(SCHEDULER_LEASE, PROCESS_ID, time.time(), SCHEDULER_LEASE_TTL)
+                except Exception as e:
+                    logger.error(f"Could not renew the refresh scheduler lease: {e}")
+                    leading = False
+
+                if leading and not self._tasks:
+                    logger.info(f"Running refresh workers in process {os.getpid()}")
+                    self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+                elif not leading and self._tasks:
+                    await self._stop_workers()
+                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            if self._tasks:
+                await self._stop_workers()
+                # Hand over now rather than when the lease expires.
+                await release_lease(SCHEDULER_LEASE, PROCESS_ID)
+
+    async def _stop_workers(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await claim_refresh_job(time.time(), JOB_LEASE)
+            except Exception as e:
+                logger.error(f"Could not claim refresh job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(*job)
+
+    async def _run(self, faculty_id: int, attempts: int):
+        from scraper import ScrapeBlocked
+        try:
+            faculty = await get_faculty(faculty_id)
+            if faculty is None:
+                await complete_refresh(faculty_id)
+                refresh_jobs.inc("deleted")
+                return
+
+            try:
+                update_data = await self.scrape(faculty)
+            except HostUnavailable as e:
+                # Not the profile's fault; retry once the host is reachable
+                # again without counting an attempt.
+                await reschedule_refresh(faculty_id, e.open_until, attempts, str(e))
+                refresh_jobs.inc("host_paused")
+                return
+            except ScrapeBlocked as e:
+                await reschedule_refresh(faculty_id, self.breaker(e.host).open_until, attempts + 1, str(e))
+                refresh_jobs.inc("blocked")
+                return
+
+            try:
+                await save_refresh(faculty, update_data)
+            except VersionConflict as e:
+                # Edited while it was being scraped; scrape again on top of
+                # the edit.
+                await reschedule_refresh(faculty_id, time.time(), attempts, str(e))
+                refresh_jobs.inc("conflict")
+                return
+            await complete_refresh(faculty_id)
+            refresh_jobs.inc("completed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            delay = backoff_delay(attempts + 1, REFRESH_BACKOFF_BASE, REFRESH_BACKOFF_MAX)
+            logger.error(f"Refresh of faculty {faculty_id} failed (attempt {attempts + 1}): {e}")
+            await reschedule_refresh(faculty_id, time.time() + delay, attempts + 1, str(e))
+            refresh_jobs.inc("failed")
+
+refresh_scheduler = RefreshScheduler()
@@ -1,131 +1,310 @@
-import requests
-from bs4 import BeautifulSoup
+import httpx
 import asyncio
-from typing import Dict, Any, List
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Callable, Dict, Any, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
 import logging
 
+import page_cache
+from profiling import span
+from metrics import (
+    page_cache_requests, scraper_fetch_duration, scraper_fetches,
+    scraper_parse_duration, scraper_scrapes
+)
+from parsers import empty_linkedin_data, parse_google_scholar, parse_linkedin
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def scrape_linkedin_sync(url: str) -> Dict[str, Any]:
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        data = {
-            'profile_picture_url': None,
-            'headline': None,
-            'experience': [],
-            'certifications': [],
-            'projects': []
-        }
-        
-        try:
-            img_tag = soup.find('img', class_=lambda x: x and 'profile' in x.lower() if x else False)
-            if not img_tag:
-                img_tag = soup.find('img', attrs={'alt': True})
-            if img_tag and img_tag.get('src'):
-                data['profile_picture_url'] = img_tag['src']
-        except Exception as e:
-            logger.warning(f"Could not extract profile picture: {e}")
-        
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "10"))
+SCRAPER_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "5"))
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "20"))
+# httpx only limits the pool as a whole, so concurrent requests to a single
+# host are capped separately.
+SCRAPER_PER_HOST_CONNECTIONS = int(os.getenv("SCRAPER_PER_HOST_CONNECTIONS", "4"))
+
+# HTML parsing is CPU-bound, so it runs in worker processes rather than
+# competing with request handling for the GIL. 0 parses in a thread instead.
+SCRAPER_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "2"))
+# Parses waiting for or running in the pool; further pages wait for a slot.
+SCRAPER_MAX_PENDING_PARSES = int(os.getenv("SCRAPER_MAX_PENDING_PARSES", "8"))
+
+# Scholar serves at most 100 rows per page.
+SCHOLAR_PAGE_SIZE = 100
+# Safety cap on how far back a single refresh walks a profile.
+SCHOLAR_MAX_PAGES = int(os.getenv("SCHOLAR_MAX_PAGES", "20"))
+SCHOLAR_PAGE_INTERVAL = float(os.getenv("SCHOLAR_PAGE_INTERVAL", "1.0"))
+
+# LinkedIn answers 999 instead of 429 when it decides a client is a bot.
+BLOCKED_STATUSES = {429, 999}
+
+_client: Optional[httpx.AsyncClient] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_slots = asyncio.Semaphore(SCRAPER_MAX_PENDING_PARSES)
+
+class ScrapeBlocked(Exception):
+    def __init__(self, host: str, status_code: int):
+        super().__init__(f"{host} refused the request with HTTP {status_code}")
+        self.host = host
+        self.status_code = status_code
+
+def check_blocked(url: str, response: httpx.Response):
+    if response.status_code in BLOCKED_STATUSES:
+        raise ScrapeBlocked(urlparse(url).hostname, response.status_code)
+
+def get_client() -> httpx.AsyncClient:
+    # One client for the whole process so keep-alive connections (and their
+    # TLS sessions) are reused across profiles.
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=httpx.Timeout(SCRAPER_TIMEOUT, connect=SCRAPER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=SCRAPER_MAX_CONNECTIONS
+            )
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    close_parse_pool()
+
+async def fetch(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    host = urlparse(url).hostname or ""
+    if host not in _host_slots:
+        _host_slots[host] = asyncio.Semaphore(SCRAPER_PER_HOST_CONNECTIONS)
+
+    async with _host_slots[host]:
+        start = time.perf_counter()
         try:
-            headline_elem = soup.find('div', class_=lambda x: x and 'headline' in x.lower() if x else False)
-            if not headline_elem:
-                headline_elem = soup.find('h2', class_=lambda x: x and 'top-card' in x.lower() if x else False)
-            if headline_elem:
-                data['headline'] = headline_elem.get_text(strip=True)
-        except Exception as e:
-            logger.warning(f"Could not extract headline: {e}")
-        
+            response = await get_client().get(url, headers=headers)
+        except httpx.HTTPError:
+            scraper_fetches.inc(host, "error")
+            raise
+        finally:
+            scraper_fetch_duration.observe(time.perf_counter() - start, host)
+    scraper_fetches.inc(host, str(response.status_code))
+    check_blocked(url, response)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn, not fork: the server process already runs threads (the
+        # database pool among them) that a forked child would inherit mid-use.
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=SCRAPER_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parse_pool
+
+def close_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+async def parse_page(parser: Callable[[bytes], Any], content: bytes) -> Any:
+    # Only the page bytes go to the worker and only the extracted fields come
+    # back; the parse tree never leaves the worker process.
+    start = time.perf_counter()
+    try:
+        async with _parse_slots:
+            with span("parse"):
+                if SCRAPER_PARSE_WORKERS <= 0:
+                    return await asyncio.to_thread(parser, content)
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(get_parse_pool(), parser, content)
+                except BrokenProcessPool:
+                    logger.warning("Parse worker died; restarting the pool")
+                    close_parse_pool()
+                    return await asyncio.to_thread(parser, content)
+    finally:
+        scraper_parse_duration.observe(time.perf_counter() - start, parser.__name__)
+
+# (extracted data, content hash). Data is None when the page is unchanged,
+# and both are None when it could not be fetched.
+ScrapeResult = Tuple[Optional[Any], Optional[str]]
+
+class Page(NamedTuple):
+    content: bytes
+    content_hash: str
+
+async def fetch_page(url: str) -> Page:
+    # Revalidates against the on-disk page cache, so an unchanged page costs
+    # a 304 instead of a full download.
+    entry = await asyncio.to_thread(page_cache.load_entry, url)
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = await fetch(url, headers)
+    if response.status_code == 304:
+        content = await asyncio.to_thread(page_cache.read_object, entry["content_hash"]) if entry else None
+        if content is not None:
+            page_cache_requests.inc("hit")
+            return Page(content, entry["content_hash"])
+        # The cached body is gone; fetch it again without validators.
+        response = await fetch(url)
+
+    page_cache_requests.inc("miss")
+    content_hash = await asyncio.to_thread(
+        page_cache.store, url, response.content,
+        response.headers.get("ETag"), response.headers.get("Last-Modified")
+    )
+    return Page(response.content, content_hash)
+
+async def scrape_linkedin(url: str, known_hash: Optional[str] = None) -> ScrapeResult:
+    try:
+        page = await fetch_page(url)
+        if page.content_hash == known_hash:
+            scraper_scrapes.inc("linkedin", "unchanged")
+            return None, page.content_hash
+        data = await parse_page(parse_linkedin, page.content)
         logger.info(f"LinkedIn scraping completed for {url}. Note: LinkedIn may require authentication for full data.")
-        
-        return data
-        
-    except requests.RequestException as e:
+        scraper_scrapes.inc("linkedin", "updated")
+        return data, page.content_hash
+
+    except ScrapeBlocked:
+        scraper_scrapes.inc("linkedin", "blocked")
+        raise
+    except httpx.HTTPError as e:
         logger.error(f"LinkedIn scraping failed for {url}: {str(e)}")
-        return {
-            'profile_picture_url': None,
-            'headline': None,
-            'experience': [],
-            'certifications': [],
-            'projects': []
-        }
     except Exception as e:
         logger.error(f"LinkedIn scraping failed for {url}: {str(e)}", exc_info=True)
-        return {
-            'profile_picture_url': None,
-            'headline': None,
-            'experience': [],
-            'certifications': [],
-            'projects': []
-        }
-
-def scrape_google_scholar_sync(url: str) -> List[Dict[str, Any]]:
+    scraper_scrapes.inc("linkedin", "failed")
+    return None, None
+
+def scholar_page_url(url: str, cstart: int) -> str:
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query.update(cstart=str(cstart), pagesize=str(SCHOLAR_PAGE_SIZE), sortby="pubdate")
+    return parsed._replace(query=urlencode(query)).geturl()
+
+def publication_key(publication: Dict[str, Any]) -> str:
+    return " ".join((publication.get("title") or "").split()).casefold()
+
+async def iter_scholar_pages(url: str) -> AsyncIterator[Page]:
+    # Newest first, one page at a time; the caller stops iterating once it
+    # has seen enough.
+    for index in range(SCHOLAR_MAX_PAGES):
+        if index:
+            await asyncio.sleep(SCHOLAR_PAGE_INTERVAL)
+        yield await fetch_page(scholar_page_url(url, index * SCHOLAR_PAGE_SIZE))
+
+def merge_publications(
+    known: List[Dict[str, Any]],
+    fetched: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    # New publications go first (they are the most recent); known ones keep
+    # their position and pick up changed fields such as the citation count.
+    by_key = {publication_key(p): p for p in fetched}
+    merged = []
+    for publication in known:
+        update = by_key.pop(publication_key(publication), None)
+        merged.append(dict(publication, **update) if update else publication)
+    return list(by_key.values()) + merged
+
+async def scrape_google_scholar(
+    url: str,
+    known: Optional[List[Dict[str, Any]]] = None,
+    known_hash: Optional[str] = None
+) -> ScrapeResult:
+    # Walks the profile sorted by date until a page contains a publication
+    # we already have, so a refresh usually costs a single page. Stored
+    # publications are never dropped, even if a later page fails. The hash
+    # returned is the first page's, which changes with any new publication.
+    known = known or []
+    known_keys = {publication_key(p) for p in known}
+    fetched = []
+    pages = 0
+    first_hash = None
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        publications = []
-        
-        try:
-            pub_rows = soup.find_all('tr', class_='gsc_a_tr')[:5]
-            
-            for row in pub_rows:
-                title_elem = row.find('a', class_='gsc_a_at')
-                authors_elem = row.find('div', class_='gs_gray')
-                year_elem = row.find('span', class_='gsc_a_h')
-                
-                if title_elem:
-                    publications.append({
-                        'title': title_elem.get_text(strip=True),
-                        'authors': authors_elem.get_text(strip=True) if authors_elem else None,
-                        'year': year_elem.get_text(strip=True) if year_elem else None,
-                        'citation': None
-                    })
-            
-            logger.info(f"Google Scholar scraping completed for {url}. Found {len(publications)} publications.")
-        except Exception as e:
-            logger.warning(f"Could not extract publications: {e}")
-        
-        return publications
-        
-    except requests.RequestException as e:
+        async for page in iter_scholar_pages(url):
+            if pages == 0:
+                first_hash = page.content_hash
+                if first_hash == known_hash:
+                    scraper_scrapes.inc("scholar", "unchanged")
+                    return None, first_hash
+            pages += 1
+            rows = await parse_page(parse_google_scholar, page.content)
+            fetched.extend(rows)
+            if len(rows) < SCHOLAR_PAGE_SIZE or any(publication_key(p) in known_keys for p in rows):
+                break
+
+    except ScrapeBlocked:
+        scraper_scrapes.inc("scholar", "blocked")
+        raise
+    except httpx.HTTPError as e:
         logger.error(f"Google Scholar scraping failed for {url}: {str(e)}")
-        return []
     except Exception as e:
         logger.error(f"Google Scholar scraping failed for {url}: {str(e)}", exc_info=True)
-        return []
-
-async def scrape_faculty_data(linkedin_url: str = None, scholar_url: str = None) -> Dict[str, Any]:
-    loop = asyncio.get_event_loop()
-    
-    linkedin_data = {}
-    publications = []
-    
-    if linkedin_url:
-        linkedin_data = await loop.run_in_executor(None, scrape_linkedin_sync, linkedin_url)
-    
-    if scholar_url:
-        publications = await loop.run_in_executor(None, scrape_google_scholar_sync, scholar_url)
-    
-    return {
-        'profile_picture_url': linkedin_data.get('profile_picture_url'),
-        'headline': linkedin_data.get('headline'),
-        'experience': linkedin_data.get('experience', []),
-        'certifications': linkedin_data.get('certifications', []),
-        'projects': linkedin_data.get('projects', []),
-        'publications': publications
+
+    if pages == 0:
+        scraper_scrapes.inc("scholar", "failed")
+        return None, None
+    scraper_scrapes.inc("scholar", "updated")
+    publications = merge_publications(known, fetched)
+    logger.info(
+        f"Google Scholar scraping completed for {url}. Read {pages} page(s), "
+        f"{len(publications) - len(known)} new publications."
+    )
+    return publications, first_hash
+
+async def _no_result(value):
+    return value
+
+async def scrape_faculty_data(
+    linkedin_url: str = None,
+    scholar_url: str = None,
+    known_hashes: Optional[Dict[str, str]] = None,
+    known_publications: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    # Both sources are fetched at once, so a refresh costs the slower of the
+    # two rather than their sum. A source whose page still hashes to its
+    # entry in known_hashes is left out of the result entirely, and
+    # page_hashes reports the hash of every page read. known_publications
+    # are merged with what Scholar returns.
+    known_hashes = known_hashes or {}
+    results = await asyncio.gather(
+        scrape_linkedin(linkedin_url, known_hashes.get(linkedin_url))
+        if linkedin_url else _no_result((empty_linkedin_data(), None)),
+        scrape_google_scholar(scholar_url, known_publications, known_hashes.get(scholar_url))
+        if scholar_url else _no_result(([], None)),
+        return_exceptions=True
+    )
+    # Let both finish before reporting a block, so neither is left running.
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    (linkedin_data, linkedin_hash), (publications, scholar_hash) = results
+
+    sources = [(linkedin_url, linkedin_hash), (scholar_url, scholar_hash)]
+    data = {
+        'page_hashes': {url: content_hash for url, content_hash in sources if url and content_hash},
+        'failed_sources': [url for url, content_hash in sources if url and not content_hash],
     }
+    if linkedin_data is not None:
+        data.update(linkedin_data)
+    if publications is not None:
+        data['publications'] = publications
+    return data
@@ -0,0 +1,181 @@
+import bisect
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Suggestion kinds, in the order their matches are listed.
+KINDS = ("name", "department", "designation", "project", "publication")
+# Words that never start a key; nobody types "of ..." expecting a title.
+STOPWORDS = {"a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or", "the", "to", "with"}
+# Delta entries (plus entries of removed terms) tolerated before compacting,
+# as a share of the main arrays.
+COMPACT_RATIO = 8
+MIN_COMPACT_ENTRIES = 4096
+
+_WORD = re.compile(r"\w+")
+_PARTS = [(kind, whole) for kind in KINDS for whole in (True, False)]
+
+def normalize(text: str) -> str:
+    # Lowercased words without diacritics, joined by single spaces; the same
+    # folding the search index applies.
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(_WORD.findall(text))
+
+def word_starts(key: str) -> List[str]:
+    # The key from each word on, so "graph" also finds "deep graph models".
+    words = key.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if i == 0 or words[i] not in STOPWORDS]
+
+class Term:
+    __slots__ = ("kind", "text", "ident", "faculty_ids", "entries")
+
+    def __init__(self, kind: str, text: str, ident: tuple, entries: int):
+        self.kind = kind
+        self.text = text
+        self.ident = ident
+        self.faculty_ids: Set[int] = set()
+        self.entries = entries
+
+# Prefix index for as-you-type suggestions. Each distinct term (a name, or a
+# department, designation, project or publication title shared by any number
+# of profiles) is stored once, with one (key, term id) entry per word start
+# in sorted arrays per kind, so a lookup is a bisect plus a short scan.
+# Whole keys and later word starts have separate arrays, so the terms that
+# start with the query are found first without scanning the others. New
+# entries go to a small sorted delta array and removed terms are only marked
+# dead; both are folded into the main arrays once they grow past a share of
+# them, which keeps updates cheap without the arrays degrading.
+class SuggestIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._terms: Dict[int, Term] = {}
+        self._term_ids: Dict[tuple, int] = {}
+        self._by_faculty: Dict[int, Set[int]] = {}
+        # Keyed by (kind, whole): whole keys, or the word starts after them.
+        self._main: Dict[Tuple[str, bool], List[Tuple[str, int]]] = {part: [] for part in _PARTS}
+        self._delta: Dict[Tuple[str, bool], List[Tuple[str, int]]] = {part: [] for part in _PARTS}
+        self._dead: Set[int] = set()
+        self._main_entries = 0
+        self._stale_entries = 0
+        self._next_id = 0
+
+    def build(self, rows: Iterable[Tuple[int, str, str]]):
+        # rows are (faculty id, kind, text) for the whole directory.
+        self.clear()
+        self.update((), rows)
+
+    def update(self, faculty_ids: Iterable[int], rows: Iterable[Tuple[int, str, str]]):
+        # Replaces the terms of faculty_ids with rows (none for a deleted
+        # profile).
+        for faculty_id in faculty_ids:
+            self._remove_faculty(faculty_id)
+        added: Dict[Tuple[str, bool], List[Tuple[str, int]]] = {part: [] for part in _PARTS}
+        # Departments and designations repeat across most rows.
+        keys: Dict[str, str] = {}
+        for faculty_id, kind, text in rows:
+            if not text:
+                continue
+            key = keys.get(text)
+            if key is None:
+                key = keys[text] = normalize(text)
+            if key:
+                self._add(faculty_id, kind, text, key, added)
+        for part, entries in added.items():
+            if entries:
+                self._delta[part] += entries
+                self._delta[part].sort()
+        delta_entries = sum(len(entries) for entries in self._delta.values())
+        if delta_entries + self._stale_entries > max(MIN_COMPACT_ENTRIES, self._main_entries // COMPACT_RATIO):
+            self._compact()
+
+    def _add(
+        self, faculty_id: int, kind: str, text: str, key: str,
+        added: Dict[Tuple[str, bool], List[Tuple[str, int]]]
+    ):
+        # People sharing a name stay separate suggestions; everything else
+        # is one suggestion however many profiles mention it.
+        ident = (kind, key, faculty_id if kind == "name" else None)
+        term_id = self._term_ids.get(ident)
+        if term_id is None:
+            term_id = self._next_id
+            self._next_id += 1
+            starts = word_starts(key)
+            self._term_ids[ident] = term_id
+            self._terms[term_id] = Term(kind, text.strip(), ident, len(starts))
+            added[kind, True].append((key, term_id))
+            added[kind, False].extend((start, term_id) for start in starts[1:])
+        self._terms[term_id].faculty_ids.add(faculty_id)
+        self._by_faculty.setdefault(faculty_id, set()).add(term_id)
+
+    def _remove_faculty(self, faculty_id: int):
+        for term_id in self._by_faculty.pop(faculty_id, ()):
+            term = self._terms[term_id]
+            term.faculty_ids.discard(faculty_id)
+            if not term.faculty_ids:
+                del self._terms[term_id]
+                del self._term_ids[term.ident]
+                self._dead.add(term_id)
+                self._stale_entries += term.entries
+
+    def _compact(self):
+        # Both arrays are sorted, so sort() only merges two runs.
+        for part in _PARTS:
+            merged = [entry for entry in self._main[part] if entry[1] not in self._dead]
+            merged += [entry for entry in self._delta[part] if entry[1] not in self._dead]
+            merged.sort()
+            self._main[part] = merged
+            self._delta[part] = []
+        self._main_entries = sum(len(entries) for entries in self._main.values())
+        self._dead = set()
+        self._stale_entries = 0
+
+    def _matches(self, entries: List[Tuple[str, int]], key: str, limit: int, seen: Set[int]) -> List[Tuple[str, int]]:
+        matches = []
+        index = bisect.bisect_left(entries, (key,))
+        while index < len(entries) and len(matches) < limit:
+            start, term_id = entries[index]
+            index += 1
+            if not start.startswith(key):
+                break
+            if term_id in self._dead or term_id in seen:
+                continue
+            seen.add(term_id)
+            matches.append((start, term_id))
+        return matches
+
+    def suggest(self, query: str, limit: int = 8) -> List[dict]:
+        key = normalize(query)
+        if not key:
+            return []
+        results = []
+        for kind in KINDS:
+            wanted = limit - len(results)
+            seen: Set[int] = set()
+            # Terms that start with the query first, then those matched at a
+            # later word, each by matched text; only then cut to the limit.
+            matches: List[Tuple[str, int]] = []
+            for whole in (True, False):
+                found = self._matches(self._main[kind, whole], key, wanted, seen)
+                found += self._matches(self._delta[kind, whole], key, wanted, seen)
+                found.sort()
+                matches += found[:wanted - len(matches)]
+                if len(matches) >= wanted:
+                    break
+            for _, term_id in matches:
+                term = self._terms[term_id]
+                results.append({
+                    "text": term.text,
+                    "kind": term.kind,
+                    "faculty_id": next(iter(term.faculty_ids)) if term.kind == "name" else None,
+                    "count": len(term.faculty_ids),
+                })
+            if len(results) >= limit:
+                break
+        return results
+
+    def __len__(self) -> int:
+        return len(self._terms)
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Read when the modules are first imported, which collection already does.
+os.environ.setdefault("REFRESH_WORKERS", "0")
+os.environ.setdefault("READ_MODEL_POLL_INTERVAL", "0")
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import database
+    import main
+    from auth import create_access_token
+    from read_model import read_model
+
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "faculty_hub.db"))
+    # The read model is loaded once per process; load it from this database.
+    monkeypatch.setattr(read_model, "_loaded", False)
+    with TestClient(main.app) as client:
+        client.headers["Authorization"] = f"Bearer {create_access_token(data={'sub': 'admin'})}"
+        yield client
@@ -0,0 +1,38 @@
+def upload(client, filename, content):
+    response = client.post("/api/admin/faculty/bulk", files={"file": (filename, content, "text/plain")})
+    assert response.status_code == 200
+    return response.json()
+
+def test_csv_export_round_trip_keeps_publications(client):
+    publications = [
+        {"title": "Graph theory", "authors": "A. Smith", "year": "2021", "citation": "J. Graphs; 3", "cited_by": 12},
+        {"title": "Deep graph models", "authors": None, "year": None, "citation": None, "cited_by": None},
+    ]
+    faculty = client.post("/api/admin/faculty", json={
+        "name": "Alice Smith",
+        "email": "alice@example.edu",
+        "projects": [{"title": "Graphs", "description": "Lab"}],
+        "publications": publications,
+    }).json()
+
+    export = client.get("/api/admin/faculty/export?format=csv").content
+    assert upload(client, "faculty.csv", export)["updated"] == 1
+
+    profile = client.get(f"/api/faculty/{faculty['id']}").json()
+    assert profile["publications"] == publications
+    assert profile["projects"] == [{"title": "Graphs", "description": "Lab"}]
+
+def test_csv_import_leaves_columns_it_lacks_alone(client):
+    faculty = client.post("/api/admin/faculty", json={
+        "name": "Alice Smith",
+        "email": "alice@example.edu",
+        "headline": "Graphs",
+        "publications": [{"title": "Graph theory"}],
+    }).json()
+
+    upload(client, "office.csv", b"name,email,office\nAlice Smith,ALICE@example.edu,Room 5\n")
+
+    profile = client.get(f"/api/faculty/{faculty['id']}").json()
+    assert profile["office_location"] == "Room 5"
+    assert profile["headline"] == "Graphs"
+    assert [publication["title"] for publication in profile["publications"]] == ["Graph theory"]
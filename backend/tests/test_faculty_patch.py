@@ -0,0 +1,43 @@
+def create(client, **fields):
+    response = client.post("/api/admin/faculty", json=dict({"name": "Alice Smith"}, **fields))
+    assert response.status_code == 200
+    return response.json()
+
+def test_patch_writes_only_the_fields_sent(client):
+    faculty = create(client, headline="Graphs", projects=[{"title": "Lab"}])
+
+    response = client.patch(f"/api/admin/faculty/{faculty['id']}", json={"office_location": "Room 5"})
+
+    assert response.status_code == 200
+    patched = response.json()
+    assert patched["office_location"] == "Room 5"
+    assert patched["headline"] == "Graphs"
+    assert patched["projects"] == [{"title": "Lab", "description": None}]
+    assert patched["version"] == faculty["version"] + 1
+
+def test_empty_patch_does_not_bump_the_version(client):
+    faculty = create(client)
+
+    for body in ({}, {"version": faculty["version"]}):
+        response = client.patch(f"/api/admin/faculty/{faculty['id']}", json=body)
+        assert response.status_code == 200
+        assert response.json()["version"] == faculty["version"]
+        assert response.json()["last_updated"] == faculty["last_updated"]
+
+    response = client.patch(f"/api/admin/faculty/{faculty['id']}", json={"version": faculty["version"] - 1})
+    assert response.status_code == 409
+    assert client.patch("/api/admin/faculty/999", json={}).status_code == 404
+
+def test_stale_patch_is_refused(client):
+    faculty = create(client, headline="Graphs")
+    client.patch(f"/api/admin/faculty/{faculty['id']}", json={"headline": "Networks"})
+
+    response = client.patch(
+        f"/api/admin/faculty/{faculty['id']}",
+        json={"headline": "Stale", "version": faculty["version"]}
+    )
+
+    assert response.status_code == 409
+    current = client.get(f"/api/faculty/{faculty['id']}").json()
+    assert current["headline"] == "Networks"
+    assert current["version"] == faculty["version"] + 1
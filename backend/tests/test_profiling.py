@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+
+from profiling import ProfilingMiddleware, span
+
+async def slow_app(scope, receive, send):
+    with span("db"):
+        await asyncio.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+def test_requests_are_profiled_while_others_are_in_flight():
+    stored = []
+
+    async def store(profile, keep):
+        stored.append(profile)
+
+    async def run():
+        middleware = ProfilingMiddleware(slow_app, authorize=lambda token: token == "admin", store=store)
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            other = asyncio.create_task(client.get("/"))
+            await asyncio.sleep(0.01)
+            profiled = await client.get("/", headers={"X-Profile-Token": "admin"})
+            await other
+        return profiled
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.headers["x-profile-id"] == stored[0]["id"]
+    assert stored[0]["overlapped"] == 1
+    assert stored[0]["spans"]["db"] > 0
+    assert stored[0]["functions"]
+
+def test_invalid_profiling_token_is_rejected():
+    async def run():
+        middleware = ProfilingMiddleware(slow_app, authorize=lambda token: False, store=None)
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/", headers={"X-Profile-Token": "guess"})
+
+    assert asyncio.run(run()).status_code == 401
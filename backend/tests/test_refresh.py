@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import database
+import page_cache
+import scraper
+from benchmarks.fixture_server import start_server
+from database import VersionConflict
+from refresh import build_refresh, refresh_changes
+
+@pytest.fixture
+def fixture_urls(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "faculty_hub.db"))
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", str(tmp_path / "page_cache"))
+    monkeypatch.setattr(scraper, "SCRAPER_PARSE_WORKERS", 0)
+    monkeypatch.setattr(scraper, "SCHOLAR_PAGE_INTERVAL", 0)
+    server, port = start_server()
+    yield f"http://127.0.0.1:{port}/in/asha", f"http://127.0.0.1:{port}/citations?user=asha"
+    server.shutdown()
+
+def run(scenario):
+    async def main():
+        await database.init_db()
+        try:
+            return await scenario()
+        finally:
+            await scraper.close_client()
+            await database.close_db()
+    return asyncio.run(main())
+
+def test_refresh_keeps_lists_the_scrape_did_not_find(fixture_urls):
+    linkedin_url, _ = fixture_urls
+    projects = [{"title": "Graph Learning Lab", "description": "Entered by an admin"}]
+
+    async def scenario():
+        faculty_id = await database.create_faculty({
+            "name": "Asha Sharma", "linkedin_url": linkedin_url, "projects": projects,
+            "experience": [{"position": "Professor", "company": "MIT", "duration": None}],
+        })
+        faculty = await database.get_faculty(faculty_id)
+        await database.patch_faculty(faculty_id, refresh_changes(faculty, await build_refresh(faculty)))
+        return await database.get_faculty(faculty_id)
+
+    faculty = run(scenario)
+
+    assert faculty["headline"]
+    assert faculty["projects"] == projects
+    assert faculty["experience"][0]["position"] == "Professor"
+
+def test_refresh_merges_scholar_publications_into_known_ones(fixture_urls):
+    _, scholar_url = fixture_urls
+    known = [
+        {"title": "Network federated model learning graph optimization neural", "cited_by": 1},
+        {"title": "A paper Scholar no longer lists", "cited_by": 7},
+    ]
+
+    async def scenario():
+        faculty_id = await database.create_faculty({
+            "name": "Asha Sharma", "google_scholar_url": scholar_url, "publications": known,
+        })
+        faculty = await database.get_faculty(faculty_id)
+        await database.patch_faculty(faculty_id, refresh_changes(faculty, await build_refresh(faculty)))
+        return await database.get_faculty(faculty_id)
+
+    publications = {p["title"]: p for p in run(scenario)["publications"]}
+
+    assert len(publications) > len(known)
+    assert publications[known[0]["title"]]["cited_by"] == 434
+    assert publications[known[1]["title"]]["cited_by"] == 7
+
+def test_refresh_does_not_overwrite_an_edit_made_while_scraping(fixture_urls):
+    linkedin_url, _ = fixture_urls
+
+    async def scenario():
+        faculty_id = await database.create_faculty({"name": "Asha Sharma", "linkedin_url": linkedin_url})
+        faculty = await database.get_faculty(faculty_id)
+        update_data = await build_refresh(faculty)
+        await database.patch_faculty(faculty_id, {"headline": "Set by an admin"})
+        with pytest.raises(VersionConflict):
+            await database.patch_faculty(faculty_id, refresh_changes(faculty, update_data))
+        return await database.get_faculty(faculty_id)
+
+    faculty = run(scenario)
+
+    assert faculty["headline"] == "Set by an admin"
+    assert faculty["version"] == 2
@@ -0,0 +1,37 @@
+from suggest import SuggestIndex
+
+def test_terms_starting_with_the_query_rank_first():
+    # "graph theory" sorts after the "graph analysis ..." word starts of the
+    # other titles, and used to be cut before ranking.
+    index = SuggestIndex()
+    rows = [(i, "publication", f"Deep graph analysis {i}") for i in range(10)]
+    rows.append((99, "publication", "Graph theory"))
+    index.build(rows)
+
+    results = index.suggest("graph", limit=3)
+
+    assert [result["text"] for result in results] == [
+        "Graph theory", "Deep graph analysis 0", "Deep graph analysis 1"
+    ]
+
+def test_terms_added_later_still_rank_first():
+    index = SuggestIndex()
+    index.build([(i, "project", f"Applied graph algorithms {i}") for i in range(20)])
+    index.update((), [(50, "project", "Graph theory")])
+
+    results = index.suggest("graph", limit=2)
+
+    assert results[0]["text"] == "Graph theory"
+
+def test_other_word_starts_fill_the_remaining_slots():
+    index = SuggestIndex()
+    index.build([
+        (1, "name", "Grace Hopper"),
+        (2, "name", "Alan Grant"),
+        (3, "name", "Ada Lovelace"),
+    ])
+
+    results = index.suggest("gra", limit=8)
+
+    assert [result["text"] for result in results] == ["Grace Hopper", "Alan Grant"]
+    assert results[1]["faculty_id"] == 2
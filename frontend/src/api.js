@@ -15,9 +15,10 @@ api.interceptors.request.use((config) => {
 })
 
 export const facultyAPI = {
-  getAll: () => api.get('/faculty'),
+  getAll: (params) => api.get('/faculty', { params }),
   getById: (id) => api.get(`/faculty/${id}`),
-  search: (query) => api.get(`/search?q=${query}`)
+  search: (query, params) => api.get('/search', { params: { q: query, ...params } }),
+  suggest: (query) => api.get('/suggest', { params: { q: query } })
 }
 
 export const adminAPI = {
@@ -27,7 +28,13 @@ export const adminAPI = {
       params: { linkedin_url: linkedinUrl, scholar_url: scholarUrl }
     }),
   createFaculty: (data) => api.post('/admin/faculty', data),
+  bulkImport: (file) => {
+    const formData = new FormData()
+    formData.append('file', file)
+    return api.post('/admin/faculty/bulk', formData)
+  },
   updateFaculty: (id, data) => api.put(`/admin/faculty/${id}`, data),
+  patchFaculty: (id, data) => api.patch(`/admin/faculty/${id}`, data),
   deleteFaculty: (id) => api.delete(`/admin/faculty/${id}`)
 }
 
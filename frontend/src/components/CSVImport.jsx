@@ -30,106 +30,6 @@ function CSVImport({ onClose, onSuccess }) {
     reader.readAsText(file)
   }
 
-  const parseCSV = (text) => {
-    const lines = text.split('\n').filter(l => l.trim())
-    if (lines.length < 2) {
-      throw new Error('CSV file must have at least a header row and one data row')
-    }
-
-    const headers = lines[0].split(',').map(h => h.trim())
-    const facultyList = []
-
-    for (let i = 1; i < lines.length; i++) {
-      const values = lines[i].split(',').map(v => v.trim())
-      const faculty = {}
-
-      headers.forEach((header, index) => {
-        const value = values[index] || ''
-        
-        switch(header.toLowerCase()) {
-          case 'name':
-            faculty.name = value
-            break
-          case 'title':
-          case 'designation':
-            faculty.designation = value
-            break
-          case 'department':
-            faculty.department = value
-            break
-          case 'office_location':
-          case 'office':
-            faculty.office_location = value
-            break
-          case 'email':
-            faculty.email = value
-            break
-          case 'linkedin_url':
-          case 'linkedin':
-            faculty.linkedin_url = value
-            break
-          case 'google_scholar_url':
-          case 'scholar_url':
-          case 'scholar':
-            faculty.google_scholar_url = value
-            break
-          case 'headline':
-            faculty.headline = value
-            break
-          case 'profile_picture_url':
-          case 'picture_url':
-          case 'photo_url':
-            faculty.profile_picture_url = value
-            break
-          case 'experience':
-            if (value) {
-              faculty.experience = value.split(';').map(exp => {
-                const parts = exp.split('|').map(p => p.trim())
-                return {
-                  position: parts[0] || '',
-                  company: parts[1] || '',
-                  duration: parts[2] || null
-                }
-              })
-            }
-            break
-          case 'projects':
-            if (value) {
-              faculty.projects = value.split(';').map(proj => {
-                const parts = proj.split('|').map(p => p.trim())
-                return {
-                  title: parts[0] || '',
-                  description: parts[1] || null
-                }
-              })
-            }
-            break
-          case 'certifications':
-            if (value) {
-              faculty.certifications = value.split(';').map(cert => {
-                const parts = cert.split('|').map(p => p.trim())
-                return {
-                  name: parts[0] || '',
-                  issuer: parts[1] || null
-                }
-              })
-            }
-            break
-        }
-      })
-
-      if (faculty.name) {
-        faculty.experience = faculty.experience || []
-        faculty.certifications = faculty.certifications || []
-        faculty.projects = faculty.projects || []
-        faculty.publications = []
-        facultyList.push(faculty)
-      }
-    }
-
-    return facultyList
-  }
-
   const handleUpload = async () => {
     if (!file) {
       setError('Please select a file')
@@ -140,37 +40,22 @@ function CSVImport({ onClose, onSuccess }) {
     setError(null)
 
     try {
-      const reader = new FileReader()
-      reader.onload = async (e) => {
-        try {
-          const text = e.target.result
-          const facultyList = parseCSV(text)
-
-          let successCount = 0
-          let failCount = 0
+      const response = await adminAPI.bulkImport(file)
+      const { created, updated, failed, rows } = response.data
+      const failures = rows
+        .filter(row => row.status === 'error')
+        .slice(0, 10)
+        .map(row => `Line ${row.line}: ${row.errors.join('; ')}`)
 
-          for (const faculty of facultyList) {
-            try {
-              await adminAPI.createFaculty(faculty)
-              successCount++
-            } catch (err) {
-              console.error(`Failed to create faculty ${faculty.name}:`, err)
-              failCount++
-            }
-          }
-
-          setUploading(false)
-          alert(`Import complete!\nSuccessful: ${successCount}\nFailed: ${failCount}`)
-          onSuccess()
-        } catch (err) {
-          setUploading(false)
-          setError(err.message || 'Failed to parse CSV file')
-        }
-      }
-      reader.readAsText(file)
+      setUploading(false)
+      alert(
+        `Import complete!\nCreated: ${created}\nUpdated: ${updated}\nFailed: ${failed}` +
+        (failures.length ? `\n\n${failures.join('\n')}` : '')
+      )
+      onSuccess()
     } catch (err) {
       setUploading(false)
-      setError(err.message || 'Failed to upload file')
+      setError(err.response?.data?.detail || err.message || 'Failed to upload file')
     }
   }
 
@@ -102,7 +102,9 @@ function FacultyForm({ faculty, onClose, onSave }) {
       }
 
       if (faculty) {
-        await adminAPI.updateFaculty(faculty.id, payload)
+        // Only the fields in the form (and any scraped lists) are written,
+        // and only if nobody saved the profile since it was loaded.
+        await adminAPI.patchFaculty(faculty.id, { ...payload, version: faculty.version })
       } else {
         await adminAPI.createFaculty(payload)
       }
@@ -110,7 +112,11 @@ function FacultyForm({ faculty, onClose, onSave }) {
       onSave()
     } catch (error) {
       console.error('Save failed:', error)
-      alert('Failed to save faculty')
+      if (error.response?.status === 409) {
+        alert(error.response.data.detail)
+      } else {
+        alert('Failed to save faculty')
+      }
     } finally {
       setSaving(false)
     }
@@ -41,9 +41,9 @@ function FacultyProfile() {
         </Link>
 
         <div className="profile-header">
-          {faculty.profile_picture_url && (
+          {(faculty.photo_url || faculty.profile_picture_url) && (
             <img
-              src={faculty.profile_picture_url}
+              src={faculty.photo_url ? `${faculty.photo_url}&size=256` : faculty.profile_picture_url}
               alt={faculty.name}
               className="profile-image"
             />
@@ -73,12 +73,13 @@ function FacultyProfile() {
 
         {faculty.publications && faculty.publications.length > 0 && (
           <div className="section">
-            <h2>Recent Publications</h2>
+            <h2>Publications</h2>
             {faculty.publications.map((pub, index) => (
               <div key={index} className="item">
                 <h3>{pub.title}</h3>
                 {pub.authors && <p>{pub.authors}</p>}
-                {pub.year && <p>{pub.year}</p>}
+                {pub.citation ? <p>{pub.citation}</p> : pub.year && <p>{pub.year}</p>}
+                {pub.cited_by > 0 && <p>Cited by {pub.cited_by}</p>}
               </div>
             ))}
           </div>
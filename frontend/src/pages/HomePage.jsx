@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
 import { facultyAPI } from '../api'
 import Header from '../components/Header'
@@ -6,16 +6,33 @@ import Header from '../components/Header'
 function HomePage() {
   const [faculty, setFaculty] = useState([])
   const [searchQuery, setSearchQuery] = useState('')
+  const [suggestions, setSuggestions] = useState([])
+  const [filters, setFilters] = useState({ department: '', designation: '' })
+  const [facets, setFacets] = useState({ department: [], designation: [] })
   const [loading, setLoading] = useState(true)
+  const searchTimer = useRef(null)
 
   useEffect(() => {
-    loadFaculty()
+    loadFaculty(filters)
   }, [])
 
-  const loadFaculty = async () => {
+  // Filters are applied by the API, which also returns the per-department
+  // and per-designation counts for the selects.
+  const filterParams = (selected) => ({
+    facets: true,
+    department: selected.department || undefined,
+    designation: selected.designation || undefined
+  })
+
+  const showResults = (response) => {
+    setFaculty(response.data.faculty)
+    setFacets(response.data.facets)
+  }
+
+  const loadFaculty = async (selected) => {
     try {
-      const response = await facultyAPI.getAll()
-      setFaculty(response.data)
+      const response = await facultyAPI.getAll({ view: 'summary', ...filterParams(selected) })
+      showResults(response)
     } catch (error) {
       console.error('Error loading faculty:', error)
     } finally {
@@ -23,21 +40,43 @@ function HomePage() {
     }
   }
 
-  const handleSearch = async (e) => {
+  const runSearch = async (query, selected) => {
+    try {
+      const response = await facultyAPI.search(query, filterParams(selected))
+      showResults(response)
+    } catch (error) {
+      console.error('Error searching:', error)
+    }
+  }
+
+  const handleFilter = (field) => (e) => {
+    const selected = { ...filters, [field]: e.target.value }
+    setFilters(selected)
+    clearTimeout(searchTimer.current)
+    if (searchQuery.trim() === '') {
+      loadFaculty(selected)
+    } else {
+      runSearch(searchQuery, selected)
+    }
+  }
+
+  const handleSearch = (e) => {
     const query = e.target.value
     setSearchQuery(query)
+    clearTimeout(searchTimer.current)
 
     if (query.trim() === '') {
-      loadFaculty()
+      setSuggestions([])
+      loadFaculty(filters)
       return
     }
 
-    try {
-      const response = await facultyAPI.search(query)
-      setFaculty(response.data)
-    } catch (error) {
-      console.error('Error searching:', error)
-    }
+    // Suggestions are cheap and follow every keystroke; the full search
+    // waits until typing pauses.
+    facultyAPI.suggest(query)
+      .then((response) => setSuggestions(response.data))
+      .catch((error) => console.error('Error loading suggestions:', error))
+    searchTimer.current = setTimeout(() => runSearch(query, filters), 300)
   }
 
   if (loading) {
@@ -56,7 +95,35 @@ function HomePage() {
             placeholder="Search by name, department, research area, or keyword..."
             value={searchQuery}
             onChange={handleSearch}
+            list="search-suggestions"
           />
+          <datalist id="search-suggestions">
+            {suggestions.map((suggestion) => (
+              <option
+                key={`${suggestion.kind}-${suggestion.faculty_id ?? ''}-${suggestion.text}`}
+                value={suggestion.text}
+              >
+                {suggestion.kind}
+              </option>
+            ))}
+          </datalist>
+          <div className="filter-bar">
+            {['department', 'designation'].map((field) => (
+              <select
+                key={field}
+                className="filter-select"
+                value={filters[field]}
+                onChange={handleFilter(field)}
+              >
+                <option value="">{field === 'department' ? 'All departments' : 'All designations'}</option>
+                {facets[field].map((facet) => (
+                  <option key={facet.value} value={facet.value}>
+                    {facet.value} ({facet.count})
+                  </option>
+                ))}
+              </select>
+            ))}
+          </div>
         </div>
 
         <div className="faculty-grid">
@@ -66,7 +133,13 @@ function HomePage() {
               to={`/faculty/${member.id}`}
               className="faculty-card"
             >
-              {member.profile_picture_url && (
+              {member.photo_url ? (
+                <img
+                  src={`${member.photo_url}&size=96`}
+                  srcSet={`${member.photo_url}&size=256 2x`}
+                  alt={member.name}
+                />
+              ) : member.profile_picture_url && (
                 <img src={member.profile_picture_url} alt={member.name} />
               )}
               <h3>{member.name}</h3>